@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:21:47 2026
+
+Clifford groups on 1 qubit (24 elements) and 2 qubits (11520 elements),
+modulo the global phase, with multiplication and inverse tables. Sequences
+are composed and inverted by integer table lookups, which is exact and
+avoids floating-point matrix algebra.
+
+@author: user
+"""
+from functools import lru_cache
+import numpy as np
+
+H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+S = np.diag([1, 1j])
+I = np.eye(2)
+CNOT = np.array([
+    [1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0]
+    ])
+
+
+def _key(unitary, digits=6):
+    """
+    Hashable key of a unitary modulo the global phase: the matrix is
+    rotated so that its first nonzero entry is real and positive, then
+    rounded.
+
+    """
+    flat = unitary.ravel()
+    pivot = flat[np.argmax(np.abs(flat) > 10 ** -digits)]
+    flat = flat * (abs(pivot) / pivot)
+    scale = 10 ** digits
+    return np.rint(np.concatenate((flat.real, flat.imag)) * scale).astype(
+        np.int64
+        ).tobytes()
+
+
+class CliffordGroup:
+
+    def __init__(self, qubitNum=1):
+        """
+        Clifford group generated from H and S on every qubit, and CNOT for 2
+        qubits. Elements are indexed in breadth-first order of the
+        generation, index 0 being the identity.
+
+        Parameters
+        ----------
+        qubitNum : int, optional
+            Number of qubits, 1 or 2. The default is 1.
+
+        Returns
+        -------
+        CliffordGroup
+            Group object with the attributes:
+                elements : (N, d, d) array of unitaries.
+                mul : (N, N) table, elements[mul[a, b]] equals
+                    elements[a] @ elements[b] up to a phase.
+                inv : (N,) table, elements[inv[a]] is the inverse of
+                    elements[a] up to a phase.
+
+        """
+        if qubitNum == 1:
+            generators = [H, S]
+        elif qubitNum == 2:
+            generators = [
+                np.kron(H, I), np.kron(I, H), np.kron(S, I), np.kron(I, S),
+                CNOT
+                ]
+        else:
+            raise ValueError('Only 1 or 2 qubits are supported')
+        self.qubitNum = qubitNum
+        dim = 2 ** qubitNum
+        # breadth-first generation, element a = generators[gen[a]] @ parent
+        elements = [np.eye(dim, dtype=complex)]
+        self._index = {_key(elements[0]): 0}
+        parent, gen = [0], [-1]
+        left = [[] for _ in generators]
+        pos = 0
+        while pos < len(elements):
+            for k, generator in enumerate(generators):
+                product = generator @ elements[pos]
+                key = _key(product)
+                if key not in self._index:
+                    self._index[key] = len(elements)
+                    elements += [product]
+                    parent += [pos]
+                    gen += [k]
+                left[k] += [self._index[key]]
+            pos += 1
+        self.elements = np.array(elements)
+        num = len(elements)
+        left = np.array(left)
+        dtype = np.uint8 if num <= 2 ** 8 else np.uint16
+        # row a of the table follows from the row of its parent by a lookup
+        # in the generator table
+        self.mul = np.empty((num, num), dtype=dtype)
+        self.mul[0] = np.arange(num)
+        for a in range(1, num):
+            self.mul[a] = left[gen[a], self.mul[parent[a]]]
+        self.inv = np.argmin(self.mul, axis=1).astype(dtype)
+
+    def __len__(self):
+        return len(self.elements)
+
+    def index(self, unitary):
+        """
+        Find the index of a Clifford unitary.
+
+        Parameters
+        ----------
+        unitary : numpy.array
+            (d, d) unitary.
+
+        Returns
+        -------
+        int
+            Index of the element equal to unitary up to a phase.
+
+        """
+        try:
+            return self._index[_key(np.asarray(unitary))]
+        except KeyError:
+            raise ValueError('Not an element of the Clifford group') from None
+
+    def accumulate(self, indices):
+        """
+        Compose sequences step by step by table lookups.
+
+        Parameters
+        ----------
+        indices : numpy.array
+            (..., length) array of element indices, applied in order along
+            the last axis.
+
+        Returns
+        -------
+        numpy.array
+            Array shaped like indices, holding the index of the product of
+            each prefix, i.e. elements[indices[..., k]] @ ... @
+            elements[indices[..., 0]].
+
+        """
+        indices = np.asarray(indices)
+        out = np.empty(indices.shape, dtype=self.mul.dtype)
+        product = np.zeros(indices.shape[:-1], dtype=self.mul.dtype)
+        for step in range(indices.shape[-1]):
+            product = self.mul[indices[..., step], product]
+            out[..., step] = product
+        return out
+
+    def recovery(self, indices):
+        """
+        Find the recovery elements of sequences, which bring the products
+        back to the identity.
+
+        Parameters
+        ----------
+        indices : numpy.array
+            (..., length) array of element indices, applied in order along
+            the last axis.
+
+        Returns
+        -------
+        numpy.array
+            (...) array of indices of the inverse products.
+
+        """
+        indices = np.asarray(indices)
+        if not indices.shape[-1]:
+            return np.zeros(indices.shape[:-1], dtype=self.mul.dtype)
+        return self.inv[self.accumulate(indices)[..., -1]]
+
+
+@lru_cache(maxsize=None)
+def clifford_group(qubitNum=1):
+    """
+    Return the Clifford group on qubitNum qubits, generated once per
+    process.
+
+    """
+    return CliffordGroup(qubitNum)
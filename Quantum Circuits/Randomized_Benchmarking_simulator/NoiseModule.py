@@ -0,0 +1,322 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 16:40:12 2026
+
+Noise simulation on Pauli transfer matrices (PTM). A channel on n qubits is
+a real (4^n, 4^n) matrix acting on the Pauli vector r_i = Tr(P_i rho) of a
+density matrix, with the normalized Pauli basis P_i = sigma_i / sqrt(2^n)
+ordered as the Kronecker products of (I, X, Y, Z). Channels compose by
+matrix products and combine across qubits by Kronecker products. Channel
+constructors take arrays of parameters and return stacks of PTMs, so a
+sweep over noise parameters is simulated as batched real-matrix products.
+
+@author: user
+"""
+from functools import lru_cache
+import numpy as np
+from CliffordModule import clifford_group
+from RBModule import random_sequences, propagate
+
+PAULI = np.array([
+    [[1, 0], [0, 1]], [[0, 1], [1, 0]], [[0, -1j], [1j, 0]], [[1, 0], [0, -1]]
+    ])
+
+
+@lru_cache(maxsize=None)
+def pauli_basis(qubitNum=1):
+    """
+    Return the normalized Pauli basis.
+
+    Parameters
+    ----------
+    qubitNum : int, optional
+        Number of qubits. The default is 1.
+
+    Returns
+    -------
+    numpy.array
+        (4^n, 2^n, 2^n) array of Pauli matrices divided by sqrt(2^n).
+
+    """
+    basis = np.ones((1, 1, 1))
+    for _ in range(qubitNum):
+        basis = np.einsum('aij,bkl->abikjl', basis, PAULI).reshape(
+            len(basis) * 4, len(basis[0]) * 2, len(basis[0]) * 2
+            )
+    return basis / np.sqrt(len(basis[0]))
+
+
+def _qubitNum(dim):
+    return int(np.log2(dim))
+
+
+def ptm(unitaries):
+    """
+    Pauli transfer matrices of unitaries, R_ij = Tr(P_i U P_j U^dag).
+
+    Parameters
+    ----------
+    unitaries : numpy.array
+        (..., d, d) array of unitaries.
+
+    Returns
+    -------
+    numpy.array
+        (..., d^2, d^2) array of real PTMs.
+
+    """
+    unitaries = np.asarray(unitaries)
+    basis = pauli_basis(_qubitNum(unitaries.shape[-1]))
+    conjugated = unitaries[..., None, :, :] @ basis @ \
+        unitaries[..., None, :, :].conj().swapaxes(-1, -2)
+    return np.einsum('iab,...jba->...ij', basis, conjugated).real
+
+
+def kraus_to_ptm(kraus):
+    """
+    Pauli transfer matrix of a channel given by Kraus operators.
+
+    Parameters
+    ----------
+    kraus : numpy.array
+        (..., K, d, d) array of Kraus operators, the leading axes stacking
+        channels.
+
+    Returns
+    -------
+    numpy.array
+        (..., d^2, d^2) array of real PTMs.
+
+    """
+    kraus = np.asarray(kraus)
+    basis = pauli_basis(_qubitNum(kraus.shape[-1]))
+    conjugated = np.einsum(
+        '...kab,jbc,...kdc->...jad', kraus, basis, kraus.conj()
+        )
+    return np.einsum('iab,...jba->...ij', basis, conjugated).real
+
+
+def depolarizing(p, qubitNum=1):
+    """
+    Depolarizing channel, rho -> (1 - p) rho + p I / d.
+
+    Parameters
+    ----------
+    p : float, numpy.array
+        Depolarizing probability, or an array of them.
+    qubitNum : int, optional
+        Number of qubits. The default is 1.
+
+    Returns
+    -------
+    numpy.array
+        (..., 4^n, 4^n) PTM, stacked along the shape of p.
+
+    """
+    p = np.asarray(p, dtype=float)[..., None]
+    diagonal = np.where(np.arange(4 ** qubitNum) == 0, 1, 1 - p)
+    return diagonal[..., None] * np.eye(4 ** qubitNum)
+
+
+def dephasing(p):
+    """
+    Single-qubit dephasing channel, rho -> (1 - p) rho + p Z rho Z.
+
+    Parameters
+    ----------
+    p : float, numpy.array
+        Phase flip probability, or an array of them.
+
+    Returns
+    -------
+    numpy.array
+        (..., 4, 4) PTM, stacked along the shape of p.
+
+    """
+    p = np.asarray(p, dtype=float)
+    one = np.ones_like(p)
+    return np.stack([one, 1 - 2 * p, 1 - 2 * p, one], axis=-1)[..., None] * \
+        np.eye(4)
+
+
+def amplitude_damping(gamma):
+    """
+    Single-qubit amplitude damping channel, decaying |1> to |0> with
+    probability gamma.
+
+    Parameters
+    ----------
+    gamma : float, numpy.array
+        Decay probability, or an array of them.
+
+    Returns
+    -------
+    numpy.array
+        (..., 4, 4) PTM, stacked along the shape of gamma.
+
+    """
+    gamma = np.asarray(gamma, dtype=float)
+    out = np.zeros(gamma.shape + (4, 4))
+    out[..., 0, 0] = 1
+    out[..., 1, 1] = out[..., 2, 2] = np.sqrt(1 - gamma)
+    out[..., 3, 3] = 1 - gamma
+    out[..., 3, 0] = gamma
+    return out
+
+
+def over_rotation(angle, axis='x'):
+    """
+    Single-qubit coherent over-rotation exp(-i angle sigma_axis / 2).
+
+    Parameters
+    ----------
+    angle : float, numpy.array
+        Rotation angle in radians, or an array of them.
+    axis : str, optional
+        'x', 'y' or 'z'. The default is 'x'.
+
+    Returns
+    -------
+    numpy.array
+        (..., 4, 4) PTM, stacked along the shape of angle.
+
+    """
+    angle = np.asarray(angle, dtype=float)[..., None, None]
+    sigma = PAULI['xyz'.index(axis) + 1]
+    return ptm(np.cos(angle / 2) * np.eye(2) - 1j * np.sin(angle / 2) * sigma)
+
+
+def compose(*ptms):
+    """
+    Compose channels applied in the given order, broadcasting over the
+    leading axes.
+
+    Returns
+    -------
+    numpy.array
+        PTM of the channel applying ptms[0] first.
+
+    """
+    out = ptms[0]
+    for channel in ptms[1:]:
+        out = channel @ out
+    return out
+
+
+def tensor(*ptms):
+    """
+    Combine channels acting on separate qubits, the first one on the first
+    qubit, broadcasting over the leading axes.
+
+    Returns
+    -------
+    numpy.array
+        PTM of the product channel.
+
+    """
+    out = ptms[0]
+    for channel in ptms[1:]:
+        out = np.einsum('...ij,...kl->...ikjl', out, channel)
+        out = out.reshape(out.shape[:-4] + (
+            out.shape[-4] * out.shape[-3], out.shape[-2] * out.shape[-1]
+            ))
+    return out
+
+
+@lru_cache(maxsize=None)
+def clifford_ptms(qubitNum=1):
+    """
+    Return the PTMs of the Clifford group elements, computed once per
+    process.
+
+    """
+    return ptm(clifford_group(qubitNum).elements)
+
+
+class PTMSimulator:
+
+    def __init__(self, qubitNum=1, noise=None, interleaved=None):
+        """
+        Clifford randomized benchmarking on Pauli vectors. Each step applies
+        a random Clifford, the interleaved gate if any, and then the noise
+        channel; the recovery Clifford, found by table lookups, is followed
+        by the noise channel as well. The initial state and the measured
+        projector are |0...0><0...0|.
+
+        Parameters
+        ----------
+        qubitNum : int, optional
+            Number of qubits, 1 or 2. The default is 1.
+        noise : numpy.array, optional
+            (4^n, 4^n) PTM of the noise channel, or (M, 4^n, 4^n) PTMs
+            simulated at once. The default is None (noiseless).
+        interleaved : numpy.array, optional
+            (2^n, 2^n) Clifford unitary applied after each random Clifford,
+            for interleaved RB. The default is None.
+
+        Returns
+        -------
+        PTMSimulator
+            Simulator object.
+
+        """
+        self.group = clifford_group(qubitNum)
+        self.ptms = clifford_ptms(qubitNum)
+        self.noise = noise
+        self.interleaved = interleaved
+        # Pauli vector of |0...0><0...0|
+        basis = pauli_basis(qubitNum)
+        self.state = basis[:, 0, 0].real.copy()
+
+    def run(self, lengths, shots=1024, seed=None):
+        """
+        Simulate all sequence lengths, and all noise channels, in one call.
+
+        Parameters
+        ----------
+        lengths : list
+            Sequence lengths.
+        shots : int, optional
+            Number of random sequences per length. The default is 1024.
+        seed : None, int, numpy.random.SeedSequence, numpy.random.Generator,
+            optional
+            Seed of the random number generator. The default is None.
+
+        Returns
+        -------
+        numpy.array
+            (len(lengths), shots) array of survival probabilities, (M,
+            len(lengths), shots) for M noise channels.
+
+        """
+        group = self.group
+        steps = np.arange(len(group))
+        if self.interleaved is not None:
+            steps = group.mul[group.index(self.interleaved)]
+        lengths = np.asarray(lengths, dtype=int)
+        indices = random_sequences(
+            len(group), shots, lengths.max(initial=0), seed
+            )
+        states = propagate(
+            self.ptms[steps], indices, self.state, lengths, self.noise
+            )
+        # recovery Cliffords by table lookups
+        recovery = np.zeros((len(lengths), shots), dtype=int)
+        if indices.shape[1]:
+            products = group.accumulate(steps[indices])
+            recovery = group.inv[products[:, np.maximum(lengths - 1, 0)]].T
+            recovery[lengths == 0] = 0
+        recovery = self.ptms[recovery]
+        noise = self.noise
+        if noise is not None and np.ndim(noise) == 3:
+            # (len(lengths), M, shots, D, D)
+            recovery = recovery[:, None]
+            noise = noise[:, None]
+        final = recovery @ states[..., None]
+        if noise is not None:
+            final = noise @ final
+        # Tr(rho0 rho) with both Pauli vectors in the normalized basis
+        survival = final[..., 0] @ self.state
+        if survival.ndim == 3:
+            survival = survival.swapaxes(0, 1)
+        return survival
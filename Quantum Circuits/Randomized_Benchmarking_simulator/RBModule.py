@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:05:31 2026
+
+Vectorized randomized benchmarking (RB) engine. All random gate indices are
+drawn up front and the sequences of every shot are composed at once, one
+batched product per sequence step, so a whole sweep over sequence lengths
+costs a single pass over the longest sequence.
+
+@author: user
+"""
+import numpy as np
+from CliffordModule import CliffordGroup
+
+
+def random_sequences(gateNum, shots, length, seed=None):
+    """
+    Draw the gate indices of all random sequences up front.
+
+    Parameters
+    ----------
+    gateNum : int
+        Number of gates to draw from.
+    shots : int
+        Number of random sequences.
+    length : int
+        Length of each sequence.
+    seed : None, int, numpy.random.SeedSequence, numpy.random.Generator,
+        optional
+        Seed of the random number generator. The default is None.
+
+    Returns
+    -------
+    numpy.array
+        (shots, length) array of gate indices.
+
+    """
+    return np.random.default_rng(seed).integers(gateNum, size=(shots, length))
+
+
+def propagate(ops, indices, state, lengths, noise=None):
+    """
+    Apply batched sequences to a state by cumulative reduction. Step k
+    applies ops[indices[:, k]] to the states of all shots at once, followed
+    by the noise operator if any, and the states are recorded after each
+    requested length, so the sequences of different lengths share their
+    prefixes.
+
+    Parameters
+    ----------
+    ops : numpy.array
+        (gateNum, D, D) array of operators, e.g. unitaries acting on state
+        vectors.
+    indices : numpy.array
+        (shots, length) array of indices into ops, with length not less than
+        the longest requested length.
+    state : numpy.array
+        (D,) initial state shared by all shots, or (shots, D) states.
+    lengths : list
+        Sequence lengths to be recorded.
+    noise : numpy.array, optional
+        (D, D) operator applied after each step, or (M, D, D) operators
+        applied to M copies of the states at once, e.g. for a sweep over
+        noise parameters. The default is None.
+
+    Returns
+    -------
+    numpy.array
+        (len(lengths), shots, D) array of states, (len(lengths), M, shots,
+        D) for M noise operators.
+
+    """
+    lengths = np.asarray(lengths, dtype=int)
+    shots, dim = len(indices), ops.shape[-1]
+    batch = (shots,)
+    if noise is not None:
+        noise = np.asarray(noise)
+        if noise.ndim == 3:
+            batch = (len(noise), shots)
+            noise = noise[:, None]
+    dtype = np.result_type(ops, state, *[] if noise is None else [noise])
+    out = np.empty((len(lengths),) + batch + (dim,), dtype=dtype)
+    # slots of out to be filled after each step
+    slots = {}
+    for slot, length in enumerate(lengths):
+        slots.setdefault(length, []).append(slot)
+    state = np.array(np.broadcast_to(state, batch + (dim,)), dtype=dtype)
+    state = state[..., None]
+    if 0 in slots:
+        out[slots[0]] = state[..., 0]
+    for step in range(lengths.max(initial=0)):
+        state = ops[indices[:, step]] @ state
+        if noise is not None:
+            state = noise @ state
+        if step + 1 in slots:
+            out[slots[step + 1]] = state[..., 0]
+    return out
+
+
+class RBSimulator:
+
+    def __init__(self, gates, noise=None, interleaved=None, state=None):
+        """
+        Randomized benchmarking on state vectors. Each step of a sequence
+        applies a random gate, the interleaved gate if any, and then the
+        noise operator. For a gate array, the recovery is the ideal inverse
+        of the sequence. For a Clifford group, the sequences are composed by
+        table lookups and the recovery Clifford is applied as a noisy gate,
+        as in an experiment.
+
+        Parameters
+        ----------
+        gates : numpy.array, CliffordGroup
+            (gateNum, d, d) array of unitaries to draw from, or a Clifford
+            group.
+        noise : numpy.array, optional
+            (d, d) operator applied after each step. The default is None
+            (noiseless).
+        interleaved : numpy.array, optional
+            (d, d) unitary applied after each random gate, for interleaved
+            RB, an element of the group if gates is a CliffordGroup. The
+            default is None.
+        state : numpy.array, optional
+            Initial state vector. The default is None, i.e. |0...0>.
+
+        Returns
+        -------
+        RBSimulator
+            Simulator object.
+
+        """
+        if not isinstance(gates, CliffordGroup):
+            gates = np.asarray(gates)
+            dim = gates.shape[-1]
+        else:
+            dim = gates.elements.shape[-1]
+        self.gates = gates
+        self.noise = noise
+        self.interleaved = interleaved
+        if state is None:
+            state = np.zeros(dim)
+            state[0] = 1
+        self.state = np.asarray(state)
+
+    def run(self, lengths, shots=1024, seed=None):
+        """
+        Simulate all sequence lengths in one call.
+
+        Parameters
+        ----------
+        lengths : list
+            Sequence lengths.
+        shots : int, optional
+            Number of random sequences per length. The default is 1024.
+        seed : None, int, numpy.random.SeedSequence, numpy.random.Generator,
+            optional
+            Seed of the random number generator. The default is None.
+
+        Returns
+        -------
+        numpy.array
+            (len(lengths), shots) array of survival probabilities. The mean
+            over axis 1 gives the RB decay.
+
+        """
+        if isinstance(self.gates, CliffordGroup):
+            return self._runClifford(lengths, shots, seed)
+        steps = self.gates
+        if self.interleaved is not None:
+            steps = self.interleaved @ steps
+        noisy = steps if self.noise is None else self.noise @ steps
+        indices = random_sequences(
+            len(steps), shots, np.max(lengths, initial=0), seed
+            )
+        ideal = propagate(steps, indices, self.state, lengths)
+        actual = propagate(noisy, indices, self.state, lengths)
+        # the ideal sequence U is unitary, so the recovery U^-1 = U^dag and
+        # <psi|U^dag N|psi> = <U psi|N psi>
+        amplitude = np.einsum('lsi,lsi->ls', ideal.conj(), actual)
+        return np.abs(amplitude) ** 2
+
+    def _runClifford(self, lengths, shots=1024, seed=None):
+        """
+        Backend method of run() for a Clifford group.
+
+        """
+        group = self.gates
+        # group index of each step, the interleaved gate following the
+        # random one
+        steps = np.arange(len(group))
+        if self.interleaved is not None:
+            steps = group.mul[group.index(self.interleaved)]
+        ops = group.elements[steps]
+        noisy = ops if self.noise is None else self.noise @ ops
+        lengths = np.asarray(lengths, dtype=int)
+        indices = random_sequences(
+            len(group), shots, lengths.max(initial=0), seed
+            )
+        actual = propagate(noisy, indices, self.state, lengths)
+        # recovery Cliffords by table lookups
+        recovery = np.zeros((len(lengths), shots), dtype=int)
+        if indices.shape[1]:
+            products = group.accumulate(steps[indices])
+            recovery = group.inv[products[:, np.maximum(lengths - 1, 0)]].T
+            recovery[lengths == 0] = 0
+        recovery = group.elements[recovery]
+        if self.noise is not None:
+            recovery = self.noise @ recovery
+        final = (recovery @ actual[..., None])[..., 0]
+        amplitude = np.einsum('lsi,i->ls', final, self.state.conj())
+        return np.abs(amplitude) ** 2
@@ -0,0 +1,377 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 19:26:58 2026
+
+Randomized benchmarking experiment runner. Jobs over (length group, seed,
+noise parameter) run on a process pool with reproducible random streams,
+results are aggregated as the jobs complete and checkpointed, so an
+interrupted experiment resumes where it stopped. The decay curves of all
+noise parameters are fitted at once.
+
+@author: user
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+import os
+import numpy as np
+from NoiseModule import PTMSimulator
+
+
+def _runJob(qubitNum, channel, param, interleaved, lengths, shots, seed):
+    """
+    Backend function of RBRunner.run(), simulating one job.
+
+    Returns
+    -------
+    tuple
+        Sums of the survival probabilities and of their squares over the
+        shots, one per length.
+
+    """
+    survival = PTMSimulator(qubitNum, channel(param), interleaved).run(
+        lengths, shots, seed
+        )
+    return survival.sum(axis=1), (survival ** 2).sum(axis=1)
+
+
+def _channelName(channel):
+    """
+    Identifier of a channel recorded in the checkpoints: the full name of a
+    function or of the class of a callable instance, with the arguments of
+    a functools.partial object.
+
+    """
+    if isinstance(channel, partial):
+        return f'{_channelName(channel.func)}{channel.args!r}' + \
+            f'{sorted(channel.keywords.items())!r}'
+    name = getattr(channel, '__qualname__', type(channel).__qualname__)
+    return f'{channel.__module__}.{name}'
+
+
+class RBRunner:
+
+    def __init__(self, lengths, params, channel, qubitNum=1, shots=256,
+                 seeds=4, interleaved=None, entropy=0, lengthGroups=1,
+                 checkpoint=None):
+        """
+        Clifford RB experiment over sequence lengths and noise parameters,
+        simulated with PTMSimulator.
+
+        Parameters
+        ----------
+        lengths : list
+            Sequence lengths.
+        params : list
+            Noise parameters.
+        channel : callable
+            Function mapping a noise parameter to the (4^n, 4^n) PTM of the
+            noise channel on n = qubitNum qubits, e.g. NoiseModule.dephasing
+            for 1 qubit. 2-qubit runs need a 16x16 PTM, e.g.
+            functools.partial(NoiseModule.depolarizing, qubitNum=2). Must be
+            picklable, i.e. defined at module level, to run on a process
+            pool.
+        qubitNum : int, optional
+            Number of qubits, 1 or 2. The default is 1.
+        shots : int, optional
+            Number of random sequences per job. The default is 256.
+        seeds : int, optional
+            Number of jobs per length group and noise parameter, each with
+            its own random stream. The default is 4.
+        interleaved : numpy.array, optional
+            Clifford unitary for interleaved RB. The default is None.
+        entropy : int, optional
+            Root entropy of the random streams. The default is 0.
+        lengthGroups : int, optional
+            Number of groups the lengths are split into. The lengths of a
+            group are simulated in one pass sharing the sequence prefixes.
+            The default is 1.
+        checkpoint : str, optional
+            File name of the checkpoint (.npz). An existing checkpoint is
+            resumed; a ValueError is raised if it was written by another
+            experiment, i.e. different lengths, params, channel, qubitNum,
+            shots, seeds, interleaved, entropy or lengthGroups. The default
+            is None.
+
+        Raises
+        ------
+        ValueError
+            The channel does not return a (4^n, 4^n) PTM, or the checkpoint
+            belongs to a different experiment.
+
+        Returns
+        -------
+        RBRunner
+            Runner object.
+
+        """
+        dim = 4 ** qubitNum
+        shape = np.shape(channel(params[0])) if len(params) else (dim, dim)
+        if shape != (dim, dim):
+            raise ValueError(
+                f'The channel returns a PTM of shape {shape}, '
+                f'{qubitNum}-qubit RB needs ({dim}, {dim})'
+                )
+        self.lengths = np.asarray(lengths, dtype=int)
+        self.params = np.asarray(params, dtype=float)
+        self.channel = channel
+        self.qubitNum = qubitNum
+        self.shots = shots
+        self.seeds = seeds
+        self.interleaved = interleaved
+        self.entropy = entropy
+        self.groups = np.array_split(
+            np.arange(len(self.lengths)), lengthGroups
+            )
+        self.checkpoint = checkpoint
+        # sums per job, reduced over the seeds in a fixed order so the
+        # results do not depend on the completion order
+        shape = (len(self.params), seeds, len(self.lengths))
+        self._sums = np.zeros(shape)
+        self._squares = np.zeros(shape)
+        self._counts = np.zeros(shape, dtype=int)
+        self._done = np.zeros(
+            (len(self.params), seeds, len(self.groups)), dtype=bool
+            )
+        if checkpoint is not None and os.path.exists(checkpoint):
+            self._load()
+
+    def jobs(self):
+        """
+        Pending jobs.
+
+        Returns
+        -------
+        list
+            (noise index, seed index, group index) tuples of the jobs not
+            done yet.
+
+        """
+        return [tuple(job) for job in np.argwhere(~self._done)]
+
+    def run(self, workers=None):
+        """
+        Run the pending jobs. Each job draws from its own stream,
+        SeedSequence(entropy, spawn_key=job), so the results do not depend
+        on the scheduling nor on interruptions.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of processes. The default is None (serial).
+
+        Returns
+        -------
+        numpy.array
+            (len(params), len(lengths)) array of mean survival
+            probabilities.
+
+        """
+        args = {
+            job: (
+                self.qubitNum, self.channel, self.params[job[0]],
+                self.interleaved, self.lengths[self.groups[job[2]]],
+                self.shots,
+                np.random.SeedSequence(self.entropy, spawn_key=job)
+                ) for job in self.jobs()
+            }
+        if not workers:
+            for job, arg in args.items():
+                self._collect(job, _runJob(*arg))
+            return self.mean
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_runJob, *arg): job
+                       for job, arg in args.items()}
+            for future in as_completed(futures):
+                self._collect(futures[future], future.result())
+        return self.mean
+
+    def _collect(self, job, result):
+        """
+        Backend method of run() to aggregate the result of a job and save
+        the checkpoint.
+
+        """
+        noise_idx, seed_idx, group_idx = job
+        slots = self.groups[group_idx]
+        sums, squares = result
+        self._sums[noise_idx, seed_idx, slots] = sums
+        self._squares[noise_idx, seed_idx, slots] = squares
+        self._counts[noise_idx, seed_idx, slots] = self.shots
+        self._done[job] = True
+        if self.checkpoint is not None:
+            self._save()
+
+    @property
+    def mean(self):
+        """
+        Mean survival probabilities of the jobs done, nan where no job is
+        done.
+
+        """
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self._sums.sum(axis=1) / self._counts.sum(axis=1)
+
+    @property
+    def stderr(self):
+        """
+        Standard errors of the mean survival probabilities.
+
+        """
+        counts = self._counts.sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            variance = self._squares.sum(axis=1) / counts - self.mean ** 2
+            return np.sqrt(np.maximum(variance, 0) / counts)
+
+    def fit(self):
+        """
+        Fit the decay curves of all noise parameters at once.
+
+        Returns
+        -------
+        A, f, B : numpy.array
+            Fitted parameters of A f^m + B, one per noise parameter.
+        error : numpy.array
+            Average error per Clifford, (1 - f) (d - 1) / d.
+
+        """
+        A, f, B = fit_decay(self.lengths, self.mean)
+        dim = 2 ** self.qubitNum
+        return A, f, B, (1 - f) * (dim - 1) / dim
+
+    def _state(self):
+        return {
+            'lengths': self.lengths, 'params': self.params,
+            'channel': _channelName(self.channel),
+            'qubitNum': self.qubitNum,
+            'interleaved': np.empty(0) if self.interleaved is None
+            else np.asarray(self.interleaved),
+            'shots': self.shots, 'entropy': self.entropy,
+            'groups': len(self.groups), 'sums': self._sums,
+            'squares': self._squares, 'counts': self._counts,
+            'done': self._done
+            }
+
+    def _save(self):
+        """
+        Backend method to write the checkpoint, atomically replacing the
+        previous one.
+
+        """
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'wb') as file:
+            np.savez(file, **self._state())
+        os.replace(temp, self.checkpoint)
+
+    def _load(self):
+        """
+        Backend method to resume from the checkpoint.
+
+        Raises
+        ------
+        ValueError
+            The checkpoint belongs to a different experiment.
+
+        """
+        with np.load(self.checkpoint) as data:
+            for key, value in self._state().items():
+                if key in ('sums', 'squares', 'counts', 'done'):
+                    continue
+                if key not in data or not np.array_equal(data[key], value):
+                    raise ValueError(
+                        f'Checkpoint does not match the experiment ({key})'
+                        )
+            if data['done'].shape != self._done.shape:
+                raise ValueError(
+                    'Checkpoint does not match the experiment (seeds)'
+                    )
+            self._sums = data['sums']
+            self._squares = data['squares']
+            self._counts = data['counts']
+            self._done = data['done']
+
+
+def fit_decay(lengths, survival, iterations=50):
+    """
+    Least-squares fit of A f^m + B to decay curves, vectorized over the
+    curves. The decay rate f is first located on a grid, with A and B
+    solved in closed form for each grid value, then all 3 parameters are
+    refined by batched Levenberg-Marquardt steps.
+
+    Parameters
+    ----------
+    lengths : numpy.array
+        (L,) sequence lengths m.
+    survival : numpy.array
+        (..., L) survival probabilities; nan entries are ignored.
+    iterations : int, optional
+        Number of refinement steps. The default is 50.
+
+    Returns
+    -------
+    A, f, B : numpy.array
+        Fitted parameters, shaped like survival without the last axis, nan
+        for the curves with less than 3 points.
+
+    """
+    m = np.asarray(lengths, dtype=float)
+    y = np.asarray(survival, dtype=float)
+    weight = ~np.isnan(y)
+    y = np.where(weight, y, 0)
+    # grid search over f, (A, B) by linear least squares
+    grid = 1 - np.logspace(-6, 0, 400, endpoint=False)
+    basis = grid[:, None] ** m
+    # normal equations of [f^m, 1] for every curve and grid value
+    s_bb = np.einsum('...l,gl->...g', weight, basis ** 2)
+    s_b = np.einsum('...l,gl->...g', weight, basis)
+    s_1 = weight.sum(axis=-1)[..., None]
+    s_by = np.einsum('...l,gl->...g', weight * y, basis)
+    s_y = (weight * y).sum(axis=-1)[..., None]
+    det = s_bb * s_1 - s_b ** 2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        A = (s_by * s_1 - s_b * s_y) / det
+        B = (s_bb * s_y - s_b * s_by) / det
+    residual = weight[..., None, :] * (
+        A[..., None] * basis + B[..., None] - y[..., None, :]
+        )
+    cost = np.nan_to_num((residual ** 2).sum(axis=-1), nan=np.inf)
+    best = np.argmin(cost, axis=-1)[..., None]
+    params = np.stack([
+        np.take_along_axis(A, best, -1)[..., 0], grid[best[..., 0]],
+        np.take_along_axis(B, best, -1)[..., 0]
+        ], axis=-1)
+    # Levenberg-Marquardt refinement
+    damping = np.full(y.shape[:-1], 1e-3)
+
+    def _residual(params):
+        A, f, B = np.moveaxis(params, -1, 0)
+        power = np.abs(f[..., None]) ** m
+        return weight * (A[..., None] * power + B[..., None] - y), power
+
+    r, power = _residual(params)
+    cost = (r ** 2).sum(axis=-1)
+    for _ in range(iterations):
+        A, f = params[..., 0], params[..., 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            dfdm = np.where(m > 0, A[..., None] * m * power / f[..., None], 0)
+        jacobian = weight[..., None] * np.stack(
+            [power, dfdm, np.ones_like(power)], axis=-1
+            )
+        jtj = jacobian.swapaxes(-1, -2) @ jacobian
+        jtr = (jacobian.swapaxes(-1, -2) @ r[..., None])[..., 0]
+        # damped normal equations, scaled by the diagonal of J^T J
+        system = jtj + damping[..., None, None] * (
+            np.eye(3) * np.diagonal(jtj, axis1=-2, axis2=-1)[..., None, :]
+            + 1e-12 * np.eye(3)
+            )
+        step = np.linalg.solve(system, -jtr[..., None])[..., 0]
+        trial = params + step
+        r_trial, power_trial = _residual(trial)
+        cost_trial = (r_trial ** 2).sum(axis=-1)
+        better = cost_trial < cost
+        params = np.where(better[..., None], trial, params)
+        r = np.where(better[..., None], r_trial, r)
+        power = np.where(better[..., None], power_trial, power)
+        cost = np.where(better, cost_trial, cost)
+        damping = np.where(better, damping / 10, damping * 10)
+    params[weight.sum(axis=-1) < 3] = np.nan
+    return params[..., 0], params[..., 1], params[..., 2]
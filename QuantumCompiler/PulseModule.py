@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 18:02:26 2026
+
+Pulse-level simulation of compiled I/Q waveforms on a driven transmon.
+
+@author: user
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+import numpy as np
+
+
+def _evolve(simulator, I, Q, sampling_rate, state):
+    """
+    Backend function of the process pools, evolving a state with a
+    simulator object.
+
+    """
+    return simulator.evolve(I, Q, sampling_rate, state)
+
+
+class PulseSimulator:
+    # maximum number of cached eigensystems
+    EIGEN_CACHE_SIZE = 4096
+
+    def __init__(self,
+                 levels=3,
+                 anharmonicity=-2 * np.pi * 200e6,
+                 detuning=0.,
+                 drive=2 * np.pi * 50e6):
+        """
+        Driven transmon in the frame rotating at the drive frequency, within
+        the rotating wave approximation:
+            H = detuning n + anharmonicity / 2 n (n - 1)
+                + drive / 2 (I (a + a^dag) + Q i (a^dag - a)),
+        where I and Q are the amplitudes of the compiled wires. Samples are
+        held for one sampling period, so the evolution is a product of
+        piecewise-constant propagators.
+
+        Parameters
+        ----------
+        levels : int, optional
+            Number of transmon levels. The default is 3.
+        anharmonicity : float, optional
+            Anharmonicity in rad/s. The default is -2 pi 200e6.
+        detuning : float, optional
+            Qubit frequency minus drive frequency in rad/s. The default is 0.
+        drive : float, optional
+            Rabi rate in rad/s at amplitude 1. The default is 2 pi 50e6.
+
+        Returns
+        -------
+        PulseSimulator
+            Simulator object.
+
+        """
+        self.levels = levels
+        self.anharmonicity = anharmonicity
+        self.detuning = detuning
+        self.drive = drive
+        # LRU cache of the eigensystems of the Hamiltonian keyed by (I, Q)
+        self._eigen = OrderedDict()
+
+    def __setattr__(self, name, value):
+        # the cached eigensystems depend on the model parameters
+        if name in ('levels', 'anharmonicity', 'detuning', 'drive'):
+            self.__dict__['_eigen'] = OrderedDict()
+        super().__setattr__(name, value)
+
+    def hamiltonian(self, I, Q):
+        """
+        Hamiltonians at the given amplitudes.
+
+        Parameters
+        ----------
+        I : float or numpy.array
+            In-phase amplitudes.
+        Q : float or numpy.array
+            Quadrature amplitudes.
+
+        Returns
+        -------
+        numpy.array
+            (len(I), levels, levels) array of Hamiltonians in rad/s.
+
+        """
+        n = np.arange(self.levels)
+        a = np.diag(np.sqrt(n[1:]), 1)
+        static = np.diag(
+            self.detuning * n + self.anharmonicity / 2 * n * (n - 1)
+            )
+        x, y = a + a.T, 1j * (a.T - a)
+        I = np.atleast_1d(np.asarray(I, dtype=float))[:, None, None]
+        Q = np.atleast_1d(np.asarray(Q, dtype=float))[:, None, None]
+        return static + self.drive / 2 * (I * x + Q * y)
+
+    def _eigensystems(self, values):
+        """
+        Backend method to find the eigensystems of the Hamiltonians at the
+        (I, Q) values, diagonalizing the new values in a single batch. The
+        least recently used eigensystems are dropped beyond
+        EIGEN_CACHE_SIZE, so sweeping many amplitudes keeps the memory
+        bounded.
+
+        """
+        cache = self._eigen
+        keys = list(map(tuple, values))
+        missing = list(dict.fromkeys(key for key in keys if key not in cache))
+        if missing:
+            missing_values = np.array(missing)
+            w, v = np.linalg.eigh(
+                self.hamiltonian(missing_values[:, 0], missing_values[:, 1])
+                )
+            cache.update(zip(missing, zip(w, v)))
+        w, v = zip(*[cache[key] for key in keys])
+        for key in keys:
+            cache.move_to_end(key)
+        while len(cache) > self.EIGEN_CACHE_SIZE:
+            cache.popitem(last=False)
+        return np.array(w), np.array(v)
+
+    def propagator(self, I, Q, sampling_rate=1e9):
+        """
+        Propagator of the whole waveform. Runs of equal samples, e.g. flat
+        tops and idle blocks, are merged into single slices, the Hamiltonian
+        is diagonalized once per distinct (I, Q) value, and the slice
+        propagators are multiplied by pairwise (tree) reduction.
+
+        Parameters
+        ----------
+        I : numpy.array
+            In-phase samples.
+        Q : numpy.array
+            Quadrature samples.
+        sampling_rate : float, optional
+            Sampling rate of the samples. The default is 1e9.
+
+        Returns
+        -------
+        numpy.array
+            (levels, levels) propagator.
+
+        """
+        # (I, Q) pairs as complex numbers
+        samples = np.asarray(I, dtype=float) + \
+            1j * np.asarray(Q, dtype=float)
+        if not len(samples):
+            return np.eye(self.levels, dtype=complex)
+        # run-length encoding of the samples
+        starts = np.flatnonzero(np.concatenate((
+            [True], samples[1:] != samples[:-1]
+            )))
+        counts = np.diff(np.append(starts, len(samples)))
+        values, inverse = np.unique(samples[starts], return_inverse=True)
+        # repeated segments share the propagators of their runs, keyed by
+        # (value, count)
+        base = counts.max() + 1
+        runs, runInverse = np.unique(
+            inverse * base + counts, return_inverse=True
+            )
+        w, v = self._eigensystems(
+            np.stack([values.real, values.imag], axis=1)
+            )
+        w, v = w[runs // base], v[runs // base]
+        # V exp(-i w t) V^dag of each distinct run
+        phases = np.exp(-1j * w * (runs % base / sampling_rate)[:, None])
+        slices = (v * phases[:, None, :]) @ v.conj().swapaxes(-1, -2)
+        slices = slices[runInverse]
+        # later slices act on the left
+        while len(slices) > 1:
+            if len(slices) % 2:
+                slices = np.concatenate((
+                    slices, np.eye(self.levels)[None]
+                    ))
+            slices = slices[1::2] @ slices[0::2]
+        return slices[0]
+
+    def evolve(self, I, Q, sampling_rate=1e9, state=None):
+        """
+        Evolve a state under the waveform.
+
+        Parameters
+        ----------
+        I : numpy.array
+            In-phase samples.
+        Q : numpy.array
+            Quadrature samples.
+        sampling_rate : float, optional
+            Sampling rate of the samples. The default is 1e9.
+        state : numpy.array, optional
+            Initial state vector. The default is None, i.e. the ground state.
+
+        Returns
+        -------
+        numpy.array
+            Final state vector.
+
+        """
+        if state is None:
+            state = np.eye(self.levels)[0]
+        return self.propagator(I, Q, sampling_rate) @ state
+
+    def simulate(self, qcObj, wires=(0, 1), state=None):
+        """
+        Evolve a state under a compiled QubitChannel object.
+
+        Parameters
+        ----------
+        qcObj : QubitChannel
+            QubitChannel object, e.g. an element of QuantumCircuit.compiled.
+        wires : tuple, optional
+            Indices or names of the (I, Q) wires. The default is (0, 1).
+        state : numpy.array, optional
+            Initial state vector. The default is None, i.e. the ground state.
+
+        Returns
+        -------
+        numpy.array
+            Final state vector.
+
+        """
+        I, Q = self.__class__._iq(qcObj, wires)
+        return self.evolve(I, Q, qcObj.sampling_rate, state)
+
+    def simulateCkt(self, qc, wires=(0, 1), state=None, workers=None):
+        """
+        Evolve every qubit of a compiled quantum circuit, the qubits being
+        spread across processes.
+
+        Parameters
+        ----------
+        qc : QuantumCircuit
+            Compiled QuantumCircuit object.
+        wires : tuple, optional
+            Indices or names of the (I, Q) wires. The default is (0, 1).
+        state : numpy.array, optional
+            Initial state vector of every qubit. The default is None, i.e.
+            the ground state.
+        workers : int, optional
+            Number of processes. The default is None (serial).
+
+        Returns
+        -------
+        list
+            Final state vectors indexed by qubit.
+
+        """
+        if getattr(qc, 'compiled', None) is None:
+            raise RuntimeError('The object has not compiled yet')
+        channels = [self.__class__._iq(qcObj, wires) for qcObj in qc.compiled]
+        rates = [qcObj.sampling_rate for qcObj in qc.compiled]
+        return self._map(
+            [self] * len(channels), *zip(*channels), rates, state, workers
+            )
+
+    def sweep(self, I, Q, sampling_rate=1e9, state=None, workers=None,
+              **sweepArgs):
+        """
+        Evolve a state under the same waveform for a sweep of the model
+        parameters, the sweep points being spread across processes.
+
+        Parameters
+        ----------
+        I : numpy.array
+            In-phase samples.
+        Q : numpy.array
+            Quadrature samples.
+        sampling_rate : float, optional
+            Sampling rate of the samples. The default is 1e9.
+        state : numpy.array, optional
+            Initial state vector. The default is None, i.e. the ground state.
+        workers : int, optional
+            Number of processes. The default is None (serial).
+        **sweepArgs : np.array
+            Equal-length arrays of values keyed by parameter name:
+            'anharmonicity', 'detuning' or 'drive'.
+
+        Raises
+        ------
+        KeyError
+            Unknown parameter name.
+
+        Returns
+        -------
+        numpy.array
+            (sweep, levels) array of final state vectors.
+
+        """
+        for key in sweepArgs:
+            if key not in ('anharmonicity', 'detuning', 'drive'):
+                raise KeyError(f'Unknown parameter {key}')
+        values = np.broadcast_arrays(*sweepArgs.values())
+        simulators = []
+        for point in zip(*values):
+            simulator = copy(self)
+            for key, value in zip(sweepArgs, point):
+                setattr(simulator, key, value)
+            simulators += [simulator]
+        num = len(simulators)
+        return np.array(self._map(
+            simulators, [I] * num, [Q] * num, [sampling_rate] * num, state,
+            workers
+            ))
+
+    def _map(self, simulators, Is, Qs, rates, state, workers):
+        """
+        Backend method to run the evolutions, serially or on a process pool.
+
+        """
+        states = [state] * len(simulators)
+        if not workers:
+            return list(map(_evolve, simulators, Is, Qs, rates, states))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_evolve, simulators, Is, Qs, rates, states))
+
+    @classmethod
+    def _iq(cls, qcObj, wires):
+        """
+        Backend method to get the (I, Q) y data of a QubitChannel object.
+
+        """
+        names = qcObj.wire_names
+        return [
+            qcObj._wires[names.index(wire) if isinstance(wire, str) else wire]
+            .y for wire in wires
+            ]
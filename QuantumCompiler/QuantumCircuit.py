@@ -18,16 +18,18 @@ Bug:
 """
 
 import numpy as np
+from hashlib import blake2b
+from concurrent.futures import ThreadPoolExecutor
 # from WaveModule import QubitChannel
 # from TemplateModule import save, load, simple_scrollable_window
-from .WaveModule import QubitChannel
-from .TemplateModule import save, load, simple_scrollable_window
-from copy import deepcopy
+from .WaveModule import Waveform, QubitChannel, NullWave
+from .TemplateModule import Storable, save, load, simple_scrollable_window
+from copy import copy
 from tkinter import Label
 from PIL import ImageTk, Image
 
 
-class QuantumCircuit(object):
+class QuantumCircuit(Storable):
 
     def __init__(self, qubit={}, blockNum=1, readout={}):
         """
@@ -48,10 +50,12 @@ class QuantumCircuit(object):
             order is always later than qubit ones. The default is {}.
 
         """
-        self.diagram = np.asarray(
-            [[np.nan] * blockNum] * (len(qubit) + len(readout)),
-            dtype=object
-            )
+        # sparse diagram: {(qubit index, time index): QubitChannel}
+        self._cells = {}
+        self._sortedKeys = []
+        self._qubitNum = len(qubit) + len(readout)
+        self._blockNum = blockNum
+        self._resetCache()
         # check datatype and assign
         if isinstance(qubit, list):
             self._qubitDict = dict(zip(qubit, range(len(qubit))))
@@ -72,7 +76,7 @@ class QuantumCircuit(object):
             raise TypeError('readoutDict: Unsupported format')
         # index check
         for key, val in {**self._qubitDict, **self._readoutDict}.items():
-            if val >= len(self.diagram[:, 0]):
+            if val >= self._qubitNum:
                 raise ValueError(
                     f'QubitChannel \'{key}\' assignment out of bound with ' +
                     f'index: {val}'
@@ -91,6 +95,43 @@ class QuantumCircuit(object):
     def qubitDict(self):
         return self._qubitDict
 
+    @property
+    def diagram(self):
+        """
+        Get method for the circuit diagram as a dense (qubit, time) object
+        array, where unassigned cells are filled with nan. The array is a
+        snapshot; assignments should go through assign().
+
+        Returns
+        -------
+        numpy.ndarray
+            Dense circuit diagram.
+
+        """
+        diagram = np.full((self._qubitNum, self._blockNum), np.nan, object)
+        for key, qcObj in self.cells():
+            diagram[key] = qcObj
+        return diagram
+
+    @property
+    def shape(self):
+        return self._qubitNum, self._blockNum
+
+    def cells(self):
+        """
+        Iterate over the occupied cells in (qubit index, time index) order.
+
+        Yields
+        ------
+        tuple
+            ((qubit index, time index), QubitChannel) pairs.
+
+        """
+        if len(self._sortedKeys) != len(self._cells):
+            self._sortedKeys = sorted(self._cells)
+        for key in self._sortedKeys:
+            yield key, self._cells[key]
+
     @property
     def readoutDict(self):
         return self._readoutDict
@@ -110,33 +151,123 @@ class QuantumCircuit(object):
                     value is the corresponding indices in the circuit diagram.
                 list -> indices for single QubitChannel object assignment.
 
+        Gates are placed by reference, so placing the same gate many times
+        stores a single copy of its data. A placed object changed in place,
+        e.g. by Waveform.insert() on one of its wires, changes every cell it
+        is placed at, and the next compilation picks the change up. To change
+        a single placement, assign a modified copy to its indices.
+
         Returns
         -------
         None.
 
         """
-        copied = deepcopy(gateObj)
         if isinstance(mapping, dict):
             for key, idx_tag in mapping.items():
-                qubitIdx = self.get_index(idx_tag[0])
-                blockNum = idx_tag[1] - len(self.diagram[0, :]) + 1
-                if blockNum > 0:
-                    self.diagram = np.concatenate((
-                        self.diagram, np.asarray(
-                            [[np.nan] * blockNum] * len(self.diagram[:, 0])
-                            )
-                        ), axis=1)
-                self.diagram[qubitIdx, idx_tag[1]] = copied._qubitDict[key]
+                self._place(gateObj._qubitDict[key], *idx_tag)
         else:
-            qubitIdx = self.get_index(mapping[0])
-            blockNum = mapping[1] - len(self.diagram[0, :]) + 1
-            if blockNum > 0:
-                self.diagram = np.concatenate((
-                    self.diagram, np.asarray(
-                        [[np.nan] * blockNum] * len(self.diagram[:, 0])
-                        )
-                    ), axis=1)
-            self.diagram[qubitIdx, mapping[1]] = copied
+            self._place(gateObj, *mapping)
+
+    def _place(self, qcObj, qubit_name, time_idx):
+        """
+        Backend method to put a QubitChannel object into the diagram,
+        extending it in time if necessary.
+
+        Parameters
+        ----------
+        qcObj : QubitChannel
+            QubitChannel object.
+        qubit_name : str, int
+            Name or index of the qubit.
+        time_idx : int
+            Time index.
+
+        """
+        key = self.get_index(qubit_name), int(time_idx)
+        if key not in self._cells:
+            # invalidate the ordered key list
+            self._sortedKeys = []
+        elif self._grid is not None:
+            self._unref(key, self._cells[key])
+        self._cells[key] = qcObj
+        self._blockNum = max(self._blockNum, key[1] + 1)
+        self._dirty.add(key)
+        if self._grid is not None:
+            self._ref(key, qcObj)
+
+    def _ref(self, key, qcObj):
+        """
+        Backend method to record that a QubitChannel object is placed at a
+        cell.
+
+        """
+        ref = self._refs.get(id(qcObj))
+        if ref is None:
+            ref = self._refs[id(qcObj)] = [qcObj, tuple(qcObj._wires), set()]
+        ref[2].add(key)
+
+    def _unref(self, key, qcObj):
+        """
+        Backend method to drop the record of a cell overwritten by another
+        object.
+
+        """
+        ref = self._refs[id(qcObj)]
+        ref[2].discard(key)
+        if not ref[2]:
+            del self._refs[id(qcObj)]
+
+    def _touched(self):
+        """
+        Backend method of _prepare() to mark the cells of the QubitChannel
+        objects changed in place since the last call as assigned again. A
+        wire changed afterwards has a stamp above the one issued here, and
+        each placed object is checked once, however many cells share it.
+
+        """
+        checked, self._checked = self._checked, Waveform._issue()
+        for _, wires, keys in self._refs.values():
+            for waveform in wires:
+                if waveform._stamp > checked:
+                    self._dirty.update(keys)
+                    break
+
+    def __getitem__(self, key):
+        """
+        Get the QubitChannel object placed in the diagram. Denoted as
+        self[(qubit, time)].
+
+        Parameters
+        ----------
+        key : tuple
+            (qubit name or index, time index).
+
+        Returns
+        -------
+        QubitChannel
+            Placed QubitChannel object, nan if the cell is empty.
+
+        """
+        return self._cells.get(
+            (self.get_index(key[0]), int(key[1])), np.nan
+            )
+
+    def __setitem__(self, key, qcObj):
+        """
+        Place a QubitChannel object into the diagram, same as
+        self.assign(qcObj, key). Denoted as self[(qubit, time)] = qcObj.
+        The next compilation only updates the changed time indices and rows
+        as long as the spans of the time indices are unchanged.
+
+        Parameters
+        ----------
+        key : tuple
+            (qubit name or index, time index).
+        qcObj : QubitChannel
+            QubitChannel object.
+
+        """
+        self._place(qcObj, *key)
 
     def get_index(self, qubit_name):
         """
@@ -153,8 +284,8 @@ class QuantumCircuit(object):
             Qubit index.
 
         """
-        if isinstance(qubit_name, int):
-            return qubit_name
+        if isinstance(qubit_name, (int, np.integer)):
+            return int(qubit_name)
         try:
             return self.qubitDict[qubit_name]
         except KeyError:
@@ -170,18 +301,15 @@ class QuantumCircuit(object):
             Window size that is specified in string. The default is '800x600'.
 
         """
-        f = np.vectorize(
-            lambda x: x.__str__() if isinstance(x, QubitChannel) else str(
-                np.nan
-                )
-            )
-        data = f(self.diagram)
-        namefield = np.array([['']] * len(self.diagram[:, 0]), dtype=object)
+        data = np.full(self.shape, str(np.nan), object)
+        for key, qcObj in self.cells():
+            data[key] = qcObj.__str__()
+        namefield = np.array([['']] * self._qubitNum, dtype=object)
         for key, val in {**self.qubitDict, **self.readoutDict}.items():
             namefield[val] = key + f':{val}'
         data = np.hstack([namefield, data])
         timeindex = np.array(
-            [''] + list(range(len(self.diagram[0, :]))), dtype=object
+            [''] + list(range(self._blockNum)), dtype=object
             )
         data = np.array(np.vstack([timeindex, data]), dtype=str)
         # create a scrollable window
@@ -227,41 +355,451 @@ class QuantumCircuit(object):
             count += 1
         run()
 
-    def compileCkt(self):
+    def compileCkt(self, workers=None):
         """
         Compile the quantum circuit.
 
+        Parameters
+        ----------
+        workers : int, optional
+            Number of threads concatenating the rows in parallel once the
+            time indices are aligned. NumPy releases the GIL while copying
+            the samples. The default is None (serial).
+
+        """
+        diagram = self._prepare()
+        # concatenate each changed row in a single pass
+        if getattr(self, 'compiled', None) is None or \
+                len(self.compiled) != len(diagram):
+            self.compiled = np.empty(len(diagram), dtype=object)
+            self._staleRows = set(range(len(diagram)))
+        # rows with a few changed time indices are patched in place
+        for qubit_idx, cols in self._staleCells.items():
+            if qubit_idx in self._staleRows:
+                continue
+            qcObj = self._patchRow(qubit_idx, sorted(cols))
+            if qcObj is None:
+                self._staleRows.add(qubit_idx)
+            else:
+                self.compiled[qubit_idx] = qcObj
+        self._staleCells = {}
+        stale = sorted(self._staleRows)
+        if workers:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                rows = pool.map(self.__class__._concatRow, diagram[stale])
+                for qubit_idx, qcObj in zip(stale, rows):
+                    self.compiled[qubit_idx] = qcObj
+        else:
+            for qubit_idx in stale:
+                self.compiled[qubit_idx] = self.__class__._concatRow(
+                    diagram[qubit_idx]
+                    )
+        self._staleRows = set()
+
+    @classmethod
+    def _concatRow(cls, row):
+        """
+        Backend method of compileCkt() to concatenate a row of the aligned
+        diagram. Waveforms are synthesized on first access, so the wires are
+        synthesized here, in the calling thread.
+
+        Parameters
+        ----------
+        cls : QuantumCircuit class
+            QuantumCircuit class.
+        row : numpy.ndarray
+            Row of QubitChannel objects.
+
+        Returns
+        -------
+        QubitChannel
+            Compiled QubitChannel object with a new reference.
+
+        """
+        qcObj = QubitChannel.concatQubitChannels(*row)
+        for waveform in qcObj._wires:
+            waveform.y
+        return qcObj
+
+    def streamCkt(self, chunkSize=65536):
+        """
+        Compile the quantum circuit in streaming mode. Instead of storing the
+        compiled waveforms, the samples are generated in time order in chunks
+        of chunkSize points, so the memory is bounded by the chunk size times
+        the number of wires.
+
+        Parameters
+        ----------
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Yields
+        ------
+        list
+            Chunks of y indexed like self @ qubit: one list per qubit index,
+            holding the chunk of each wire. Concatenating all the chunks of
+            a wire gives the compiled y data.
+
+        """
+        diagram = self._prepare()
+        streams = [
+            [
+                Waveform._stream([
+                    wave for qcObj in row
+                    for wave in qcObj._wires[wire_idx].waveList
+                    ], chunkSize)
+                for wire_idx in range(len(row[0]._wires))
+                ] for row in diagram
+            ]
+        # all rows are aligned, so the streams end together
+        for chunk in zip(*[zip(*row) for row in streams]):
+            yield [list(wires) for wires in chunk]
+
+    def quantizeCkt(self, bits=16, fullScale=1., markers={}, markerLevel=.5,
+                    chunkSize=65536):
+        """
+        Compile the quantum circuit into signed integer DAC codes. Each row
+        is synthesized chunk by chunk straight into int16 arrays, so no float
+        waveform of the full length is created. See QubitChannel.quantize().
+
+        Parameters
+        ----------
+        bits : int, optional
+            DAC resolution, up to 16. The codes are left aligned in 16 bits.
+            The default is 16.
+        fullScale : float, optional
+            Amplitude mapped to the largest code. The default is 1.
+        markers : dict, optional
+            {wire: [marker wire, ...]} packing marker wires into the low-order
+            bits, with wires given by name (of the 1st QubitChannel object in
+            the row) or index. The default is {}.
+        markerLevel : float, optional
+            Threshold of the marker bits. The default is .5.
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Returns
+        -------
+        dict
+            Numbers of saturated samples as {(qubit index, wire index):
+            count}, only for the wires with clipping.
+
+        """
+        diagram = self._prepare()
+        self.quantized = np.empty(len(diagram), dtype=object)
+        report = {}
+        for qubit_idx, row in enumerate(diagram):
+            waveLists = [
+                [
+                    wave for qcObj in row
+                    for wave in qcObj._wires[wire_idx].waveList
+                    ]
+                for wire_idx in range(len(row[0]._wires))
+                ]
+            self.quantized[qubit_idx], clipped = QubitChannel._quantizeWires(
+                waveLists, row[0].wire_names, bits, fullScale, markers,
+                markerLevel, chunkSize
+                )
+            report.update({
+                (qubit_idx, wire_idx): count
+                for wire_idx, count in clipped.items() if count
+                })
+        return report
+
+    def sequenceCkt(self):
+        """
+        Compile the quantum circuit into a pool of unique segments and
+        sequence tables, similar to the sequencer memory of an AWG. Every
+        cell contributes one segment to its wire: its y data up to (but
+        excluding) the point shared with the next cell, with the first point
+        being the junction with the previous cell. Identical segments are
+        found by hashing their content and stored once. Cells made of the
+        same waves are hashed once, and no synthesized data is kept on the
+        cells.
+
+        The results are stored in self.segmentPool, a list of read-only
+        segment arrays, and self.sequenceTable, holding one table per qubit
+        index and wire like self @ qubit. Each table is a structured array
+        of (segment, repeat, start) runs: repeat consecutive copies of the
+        segment starting at point start.
+
+        """
+        diagram = self._prepare()
+        pool, segments, summaries = [], {}, {}
+
+        def summarize(waveList):
+            # waves are read-only and shared, so cells with the same waves
+            # and padding have the same content; each distinct cell is
+            # synthesized once, temporarily, to hash it
+            key = tuple(
+                (len(waveObj), tuple(waveObj.appendRule),
+                 waveObj.sampling_rate)
+                if isinstance(waveObj, NullWave) else id(waveObj)
+                for waveObj in waveList
+                )
+            if key not in summaries:
+                y = np.ascontiguousarray(Waveform._synthesize(waveList)[0])
+                summaries[key] = blake2b(
+                    y.tobytes(), digest_size=16, person=y.dtype.str.encode()
+                    ).digest(), y[-1] if len(y) else None
+            return summaries[key]
+
+        tableType = [('segment', int), ('repeat', int), ('start', int)]
+        self.sequenceTable = np.empty(len(diagram), dtype=object)
+        for qubit_idx, row in enumerate(diagram):
+            self.sequenceTable[qubit_idx] = []
+            for wire_idx in range(len(row[0]._wires)):
+                runs = []
+                pos, last, leftRule = 0, None, None
+                for time_idx, qcObj in enumerate(row):
+                    waveform = qcObj._wires[wire_idx]
+                    waveList = waveform._waveList
+                    points = len(waveform)
+                    digest, tail = summarize(waveList)
+                    junction, leftRule = Waveform._leading(
+                        waveList, last, leftRule
+                        )
+                    isLast = time_idx == len(row) - 1
+                    size = points - (not isLast)
+                    # the shared point of a 1-point cell is the junction
+                    last = tail if points > 1 else junction
+                    if size <= 0:
+                        continue
+                    key = (digest, junction.tobytes()
+                           if isinstance(junction, np.generic)
+                           else junction, isLast)
+                    if key not in segments:
+                        y = Waveform._synthesize(waveList)[0]
+                        segment = np.array(y[:size])
+                        segment[0] = junction
+                        segment.flags.writeable = False
+                        segments[key] = len(pool)
+                        pool += [segment]
+                    if runs and runs[-1][0] == segments[key]:
+                        runs[-1][1] += 1
+                    else:
+                        runs += [[segments[key], 1, pos]]
+                    pos += size
+                self.sequenceTable[qubit_idx] += [
+                    np.array([tuple(run) for run in runs], dtype=tableType)
+                    ]
+        self.segmentPool = pool
+
+    def unroll(self, qubit):
+        """
+        Expand the sequence tables of sequenceCkt() into the y data of each
+        wire, the same as self @ qubit after compileCkt().
+
+        Parameters
+        ----------
+        qubit : str, int
+            Index or the name of qubit.
+
+        Returns
+        -------
+        list
+            List of y from each wire.
+
+        """
+        if not hasattr(self, 'sequenceTable'):
+            raise RuntimeError('The object has not sequenced yet')
+        pool = self.segmentPool
+        return [
+            np.concatenate([
+                np.tile(pool[segment], repeat)
+                for segment, repeat, _ in table
+                ]) for table in self.sequenceTable[self.get_index(qubit)]
+            ]
+
+    def _resetCache(self):
+        """
+        Backend method to drop the aligned diagram kept between compilations.
+
+        """
+        self._grid = None
+        # placed objects by id: [QubitChannel, wires, cells]
+        self._refs = {}
+        self._checked = 0
+        self._columns = {}
+        self._spans = []
+        self._starts = []
+        self._dirty = set()
+        self._staleRows = set()
+        self._staleCells = {}
+
+    def _prepare(self):
+        """
+        Backend method of compileCkt() to get the dense diagram of aligned
+        QubitChannel objects, with the empty cells filled with null ones and
+        the empty time indices removed. The diagram is kept between calls
+        and only the cells assigned, or changed in place, since then are
+        aligned again, unless the span of a time index changes. The rows changed are added to
+        self._staleRows.
+
+        Returns
+        -------
+        numpy.ndarray
+            2D object array of QubitChannel objects.
+
+        """
+        self._touched()
+        if self._grid is None or not self._patch():
+            self._grid = self._build()
+            self._staleRows = set(range(self._qubitNum))
+            self._staleCells = {}
+        self._dirty = set()
+        return self._grid
+
+    def _patch(self):
+        """
+        Backend method of _prepare() to update the kept diagram with the
+        cells assigned since the last call.
+
+        Returns
+        -------
+        bool
+            False if the diagram must be rebuilt, i.e. a new time index is
+            used, the span of a time index changes or a cell has a different
+            number of wires from its row.
+
+        """
+        grid, columns = self._grid, self._columns
+        if any(time_idx not in columns for _, time_idx in self._dirty):
+            return False
+        for time_idx in {time_idx for _, time_idx in self._dirty}:
+            span = max(
+                len(waveform)
+                for qubit_idx in range(self._qubitNum)
+                if (qubit_idx, time_idx) in self._cells
+                for waveform in self._cells[qubit_idx, time_idx]._wires
+                )
+            if span != self._spans[columns[time_idx]]:
+                return False
+        for qubit_idx, time_idx in self._dirty:
+            qcObj = self._cells[qubit_idx, time_idx]
+            if len(qcObj._wires) != len(grid[qubit_idx, 0]._wires):
+                return False
+        for qubit_idx, time_idx in self._dirty:
+            qcObj = self._cells[qubit_idx, time_idx]
+            col = columns[time_idx]
+            grid[qubit_idx, col] = QubitChannel._padded(
+                qcObj, self._spans[col]
+                )
+            self._staleCells.setdefault(qubit_idx, set()).add(col)
+        return True
+
+    def _patchRow(self, qubit_idx, cols):
+        """
+        Backend method of compileCkt() to update a compiled row at the
+        changed time indices without synthesizing the whole row again. Only
+        the points of the changed cells are rewritten, including the junction
+        points shared with the neighbors.
+
+        Parameters
+        ----------
+        qubit_idx : int
+            Qubit index.
+        cols : list
+            Changed columns of the aligned diagram.
+
+        Returns
+        -------
+        QubitChannel
+            Compiled QubitChannel object with a new reference, None if the
+            row has to be concatenated again: the changed cells or their
+            neighbors span 1 point, so a junction spreads over several cells,
+            or the data type changes.
+
+        """
+        spans, starts, row = self._spans, self._starts, self._grid[qubit_idx]
+        if any(min(spans[max(col - 1, 0):col + 2]) < 2 for col in cols):
+            return None
+        compiled = copy(self.compiled[qubit_idx])
+        for wire_idx, waveform in enumerate(compiled._wires):
+            cells = [qcObj._wires[wire_idx] for qcObj in row]
+            y = np.array(waveform.y)
+            for col in cols:
+                cellY = cells[col].y
+                if np.result_type(y, cellY) != y.dtype:
+                    return None
+                begin, end = starts[col], starts[col] + spans[col] - 1
+                left, leftRule = None, None
+                if col:
+                    left = cells[col - 1].y[-1]
+                    leftRule = Waveform._leading(cells[col - 1]._waveList)[1]
+                y[begin] = Waveform._leading(
+                    cells[col]._waveList, left, leftRule
+                    )[0]
+                y[begin + 1:end] = cellY[1:-1]
+                if col == len(row) - 1:
+                    y[end] = cellY[-1]
+                else:
+                    y[end] = Waveform._leading(
+                        cells[col + 1]._waveList, cellY[-1],
+                        Waveform._leading(cells[col]._waveList)[1]
+                        )[0]
+            y.flags.writeable = False
+            waveform._waveList = [
+                wave for cell in cells for wave in cell._waveList
+                ]
+            waveform._y = y
+        return compiled
+
+    def _build(self):
+        """
+        Backend method of _prepare() to build the aligned diagram from
+        scratch.
+
+        Returns
+        -------
+        numpy.ndarray
+            2D object array of QubitChannel objects.
+
         """
-        f = np.vectorize(lambda x: isinstance(x, QubitChannel))
-        table = f(self.diagram)
-        col_bool = np.bitwise_or.reduce(table, axis=1)
         # filter nan in 'qubit' direction
-        if not np.bitwise_and.reduce(col_bool):
+        if len({key[0] for key in self._cells}) != self._qubitNum:
             raise ValueError('Found unassigned qubit')
         # filter nan in 'time' direction
-        row_bool = np.bitwise_or.reduce(table, axis=0)
-        diagram = self.diagram[:, row_bool]
-        table = table[:, row_bool]
-        # align QubitChannel objects in the table column by column
-        for time_idx in range(len(table[0, :])):
-            diagram[table[:, time_idx], time_idx
-                    ] = QubitChannel.alignQubitChannels(
-                        *diagram[table[:, time_idx], time_idx]
-                        )
-        # replace nans with null QubitChannel objects
-        for qubit_idx, row in enumerate(table):
-            for time_idx, flag in enumerate(row):
-                if flag:
-                    continue
-                span_idx = np.where(f(diagram[:, time_idx]))[0][0]
-                wire_idx = np.where(f(diagram[qubit_idx, :]))[0][0]
-                diagram[qubit_idx, time_idx] = QubitChannel.null(
-                    diagram[span_idx, time_idx], diagram[qubit_idx, wire_idx]
+        columns = {
+            time_idx: col for col, time_idx in
+            enumerate(sorted({key[1] for key in self._cells}))
+            }
+        table = np.zeros((self._qubitNum, len(columns)), dtype=bool)
+        diagram = np.empty(table.shape, dtype=object)
+        # span of each column in points, found in one pass over the wires,
+        # which may be unaligned after an edit in place
+        spans = [0] * len(columns)
+        for (qubit_idx, time_idx), qcObj in self.cells():
+            col = columns[time_idx]
+            spans[col] = max(spans[col], *map(len, qcObj._wires))
+        # pad every cell to the span of its column in a single step, the
+        # shared placements are left unchanged
+        self._refs = {}
+        for key, qcObj in self.cells():
+            col = columns[key[1]]
+            table[key[0], col] = True
+            diagram[key[0], col] = QubitChannel._padded(qcObj, spans[col])
+            self._ref(key, qcObj)
+        # first occupied cell of each column and row
+        span_idx = table.argmax(axis=0)
+        wire_idx = table.argmax(axis=1)
+        # replace nans with null QubitChannel objects, shared among the
+        # cells of a column with the same number of wires
+        nulls = {}
+        for qubit_idx, time_idx in zip(*np.nonzero(~table)):
+            wireRef = diagram[qubit_idx, wire_idx[qubit_idx]]
+            key = (time_idx, len(wireRef._wires))
+            if key not in nulls:
+                nulls[key] = QubitChannel.null(
+                    diagram[span_idx[time_idx], time_idx], wireRef
                     )
-        try:
-            self.compiled = np.sum(diagram, axis=1)
-        except SystemError:
-            raise ValueError('Error during wire concatenation')
+            diagram[qubit_idx, time_idx] = nulls[key]
+        self._columns = columns
+        self._spans = spans
+        self._starts = np.cumsum([0] + self._spans[:-1]) - np.arange(
+            len(self._spans)
+            )
+        return diagram
 
     def __matmul__(self, qubit):
         """
@@ -278,9 +816,60 @@ class QuantumCircuit(object):
             List of y from each wire in the compiled QubitChannel object.
 
         """
-        if isinstance(qubit, str):
-            qubit = self.get_index(qubit)
-        return self.compiled[qubit].y
+        if not hasattr(self, 'compiled'):
+            raise RuntimeError('The object has not compiled yet')
+        return self.compiled[self.get_index(qubit)].y
+
+    def _dump(self, writer):
+        compiled = getattr(self, 'compiled', None)
+        return {
+            'qubitDict': list(self._qubitDict.items()),
+            'readoutDict': list(self._readoutDict.items()),
+            'shape': list(self.shape),
+            'cells': [
+                [qubit_idx, time_idx, writer.ref(qcObj)]
+                for (qubit_idx, time_idx), qcObj in self.cells()
+                ],
+            'name': self._name,
+            'compiled': None if compiled is None else [
+                writer.ref(qcObj) for qcObj in compiled
+                ]
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        obj = cls.__new__(cls)
+        obj._qubitDict = dict(state['qubitDict'])
+        obj._readoutDict = dict(state['readoutDict'])
+        obj._qubitNum, obj._blockNum = state['shape']
+        obj._cells = {
+            (qubit_idx, time_idx): reader.obj(ref)
+            for qubit_idx, time_idx, ref in state['cells']
+            }
+        obj._sortedKeys = []
+        obj._resetCache()
+        obj._name = state['name']
+        if state['compiled'] is not None:
+            obj.compiled = np.empty(len(state['compiled']), dtype=object)
+            for idx, ref in enumerate(state['compiled']):
+                obj.compiled[idx] = reader.obj(ref)
+        return obj
+
+    def __setstate__(self, state):
+        # convert circuits pickled with a dense diagram
+        if 'diagram' in state:
+            diagram = state.pop('diagram')
+            state.pop('_occupancy', None)
+            state['_qubitNum'], state['_blockNum'] = diagram.shape
+            state['_cells'] = {
+                (qubit_idx, time_idx): qcObj
+                for (qubit_idx, time_idx), qcObj in np.ndenumerate(diagram)
+                if isinstance(qcObj, QubitChannel)
+                }
+            state['_sortedKeys'] = []
+        self.__dict__.update(state)
+        if '_refs' not in state:
+            self._resetCache()
 
     @classmethod
     def save(cls, *args):
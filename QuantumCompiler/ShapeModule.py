@@ -8,11 +8,43 @@ Create the following functions to build waveform
 """
 
 import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
 from inspect import getfullargspec as showarg
 
 
 
-def gaussian(x:np.array, peak_x:float, sigma:float):
+def _output(x, out=None):
+    """
+    Output buffer of the piecewise shape functions. The breakpoints of the
+    pieces are located by searchsorted, so x must be 1-D and ascending.
+
+    """
+    if np.ndim(x) != 1:
+        raise ValueError('Piecewise shape functions need a 1-D timeline')
+    if out is None:
+        return np.empty(len(x))
+    return out
+
+
+def _pieces(out, conditions, pieces, default=0.):
+    """
+    Broadcast path of the piecewise shape functions, for a timeline x of
+    shape (1, n) and arguments of shape (rows, 1), i.e. with a leading
+    parameter axis. The breakpoints are located by comparing x with them,
+    which selects the same points as searchsorted on an ascending timeline.
+    The first condition met selects the piece, evaluated by a callable.
+
+    """
+    with np.errstate(over='ignore', invalid='ignore'):
+        y = np.select(conditions, [piece() for piece in pieces], default)
+    if out is None:
+        return y
+    out[...] = y
+    return out
+
+
+def gaussian(x:np.array, peak_x:float, sigma:float, *, out=None):
     """
     Gaussian pulse generating function
 
@@ -24,6 +56,9 @@ def gaussian(x:np.array, peak_x:float, sigma:float):
         Position of Gaussian pulse peak.
     sigma : float
         Standard deviation.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -31,7 +66,13 @@ def gaussian(x:np.array, peak_x:float, sigma:float):
         Output wave values.
 
     """
-    return np.exp((-1 * (x - peak_x)**2) / (2 * sigma**2))
+    if out is None:
+        return np.exp((-1 * (x - peak_x)**2) / (2 * sigma**2))
+    np.subtract(x, peak_x, out=out)
+    np.square(out, out=out)
+    np.negative(out, out=out)
+    np.divide(out, 2 * sigma**2, out=out)
+    return np.exp(out, out=out)
 
 
 def const(x:np.array, lv:float):
@@ -54,7 +95,7 @@ def const(x:np.array, lv:float):
     return lv * np.ones(x.size)
 
 
-def exp_rising(x:np.array, peak_x:float, tau:float):
+def exp_rising(x:np.array, peak_x:float, tau:float, *, out=None):
     """
     Unit exponential rising pulse.
 
@@ -66,6 +107,9 @@ def exp_rising(x:np.array, peak_x:float, tau:float):
         Position of pulse peak.
     tau : float
         Characteristic time for exponential pulse.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -73,13 +117,21 @@ def exp_rising(x:np.array, peak_x:float, tau:float):
         Output wave values.
 
     """
-    return np.concatenate((
-        np.exp((x[x <= peak_x] - peak_x) / tau),
-        np.zeros(x[x > peak_x].size)
-        ))
+    if np.ndim(x) != 1:
+        return _pieces(
+            out, [x <= peak_x], [lambda: np.exp((x - peak_x) / tau)]
+            )
+    out = _output(x, out)
+    peak = np.searchsorted(x, peak_x, side='right')
+    head = out[:peak]
+    np.subtract(x[:peak], peak_x, out=head)
+    np.divide(head, tau, out=head)
+    np.exp(head, out=head)
+    out[peak:] = 0
+    return out
 
 
-def exp_falling(x:np.array, peak_x:float, tau:float):
+def exp_falling(x:np.array, peak_x:float, tau:float, *, out=None):
     """
     Unit exponential falling pulse.
 
@@ -91,6 +143,9 @@ def exp_falling(x:np.array, peak_x:float, tau:float):
         Position of pulse peak.
     tau : float
         Characteristic time for exponential pulse.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -98,15 +153,23 @@ def exp_falling(x:np.array, peak_x:float, tau:float):
         Output wave values.
 
     """
-    return np.concatenate((
-        np.zeros(x[x < peak_x].size),
-        np.exp((peak_x - x[x >= peak_x]) / tau)
-        ))
+    if np.ndim(x) != 1:
+        return _pieces(
+            out, [x >= peak_x], [lambda: np.exp((peak_x - x) / tau)]
+            )
+    out = _output(x, out)
+    peak = np.searchsorted(x, peak_x, side='left')
+    out[:peak] = 0
+    tail = out[peak:]
+    np.subtract(peak_x, x[peak:], out=tail)
+    np.divide(tail, tau, out=tail)
+    np.exp(tail, out=tail)
+    return out
 
 
 #def gaussian_square(x:np.array, first_peak_x:float, flat:float, sigma:float):
 #def gaussian_square(x:np.array, sigmaLen:float, flat:float, Nsigma:int):
-def gaussian_square(x:np.array, sigmaLen:float, flat:float):
+def gaussian_square(x:np.array, sigmaLen:float, flat:float, *, out=None):
     """
     Unit square pulse with Gaussian edges.
 
@@ -114,12 +177,14 @@ def gaussian_square(x:np.array, sigmaLen:float, flat:float):
     ----------
     x : np.array
         Wave event timeline, start from 0 is demanded.
-    first_peak_x : float
-        Position of the first Gaussian edge peak.
+    sigmaLen : float
+        Standard deviation of Gaussian edge. The first edge peaks at
+        4 * sigmaLen.
     flat : float
         Time span of flat top (1s).
-    sigma : float
-        Standard deviation of Gaussian edge.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -128,19 +193,29 @@ def gaussian_square(x:np.array, sigmaLen:float, flat:float):
 
     """
     Nsigma = 4
-    first_peak_x = Nsigma * sigmaLen 
-    return np.concatenate((
-        gaussian(x[x <= first_peak_x], first_peak_x, sigmaLen),
-        np.ones(
-            x[np.logical_and(x > first_peak_x, x <= first_peak_x + flat)].size
-            ),
-        gaussian(
-            x[x > first_peak_x + flat], x[x > first_peak_x + flat][0], sigmaLen
-            )
-        ))
-
-
-def exp_square(x:np.array, first_peak_x:float, flat:float, tau:float):
+    first_peak_x = Nsigma * sigmaLen
+    if np.ndim(x) != 1:
+        # the trailing edge peaks at the first point after the flat top
+        edge = first_peak_x + flat
+        last_peak_x = np.where(x > edge, x, np.inf).min(axis=-1, keepdims=True)
+        return _pieces(out, [x > edge, x <= first_peak_x], [
+            lambda: gaussian(x, last_peak_x, sigmaLen),
+            lambda: gaussian(x, first_peak_x, sigmaLen)
+            ], 1.)
+    out = _output(x, out)
+    rise, fall = np.searchsorted(
+        x, [first_peak_x, first_peak_x + flat], side='right'
+        )
+    gaussian(x[:rise], first_peak_x, sigmaLen, out=out[:rise])
+    out[rise:fall] = 1
+    if fall < len(x):
+        gaussian(x[fall:], x[fall], sigmaLen, out=out[fall:])
+    return out
+
+
+def exp_square(
+        x:np.array, first_peak_x:float, flat:float, tau:float, *, out=None
+        ):
     """
     Unit square pulse with exponential edges.
 
@@ -154,6 +229,9 @@ def exp_square(x:np.array, first_peak_x:float, flat:float, tau:float):
         Time span of flat top (1s).
     tau : float
         Characteristic time of exponential edge.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -161,15 +239,23 @@ def exp_square(x:np.array, first_peak_x:float, flat:float, tau:float):
         Output wave values.
 
     """
-    return np.concatenate((
-        exp_rising(x[x <= first_peak_x], first_peak_x, tau),
-        np.ones(
-            x[np.logical_and(x > first_peak_x, x <= first_peak_x + flat)].size
-            ),
-        exp_falling(
-            x[x > first_peak_x + flat], x[x > first_peak_x + flat][0], tau
-            )
-        ))
+    if np.ndim(x) != 1:
+        # the trailing edge peaks at the first point after the flat top
+        edge = first_peak_x + flat
+        last_peak_x = np.where(x > edge, x, np.inf).min(axis=-1, keepdims=True)
+        return _pieces(out, [x > edge, x <= first_peak_x], [
+            lambda: np.exp((last_peak_x - x) / tau),
+            lambda: np.exp((x - first_peak_x) / tau)
+            ], 1.)
+    out = _output(x, out)
+    rise, fall = np.searchsorted(
+        x, [first_peak_x, first_peak_x + flat], side='right'
+        )
+    exp_rising(x[:rise], first_peak_x, tau, out=out[:rise])
+    out[rise:fall] = 1
+    if fall < len(x):
+        exp_falling(x[fall:], x[fall], tau, out=out[fall:])
+    return out
 
 
 def sine(x:np.array, period:float, start_phase:float):
@@ -260,7 +346,7 @@ def cosine2(x:np.array, frequency:float, start_phase:float):
     return np.cos(2 * np.pi * frequency * x + start_phase)
 
 
-def square(x:np.array, start:float, flat:float):
+def square(x:np.array, start:float, flat:float, *, out=None):
     """
     Unit square pulse generating function.
 
@@ -272,6 +358,9 @@ def square(x:np.array, start:float, flat:float):
         Start time for 1s.
     flat : float
         Time span for 1s.
+    out : np.array, optional
+        Preallocated array of the same size as x to store the output in.
+        The default is None.
 
     Returns
     -------
@@ -279,16 +368,246 @@ def square(x:np.array, start:float, flat:float):
         Output wave values.
 
     """
-    return np.concatenate((
-        np.zeros(x[x < start].size),
-        np.ones(x[np.logical_and(x >= start, x <= start + flat)].size),
-        np.zeros(x[x > start + flat].size)
-        ))
+    if np.ndim(x) != 1:
+        return _pieces(
+            out, [(x >= start) & (x <= start + flat)], [lambda: 1.]
+            )
+    out = _output(x, out)
+    rise = np.searchsorted(x, start, side='left')
+    fall = np.searchsorted(x, start + flat, side='right')
+    out[:rise] = 0
+    out[rise:fall] = 1
+    out[fall:] = 0
+    return out
+
+
+def get_ticks(span:float=.0, sampling_rate:float=1e9):
+    """
+    Convert a time span into an integer number of sample clock ticks. Spans
+    are truncated as the timelines of get_x, with a tolerance of 1e-3 tick.
+    Time in seconds is quantized only here and in get_offset_ticks, all
+    spans, offsets and alignments downstream are exact integer arithmetic.
+
+    Parameters
+    ----------
+    span : float, optional
+        Time span. The default is .0.
+    sampling_rate : float, optional
+        Sampling rate for DAC. The default is 1e9 (Suggested).
+
+    Returns
+    -------
+    int
+
+    """
+    return int(round(span * sampling_rate, 3))
+
+
+def get_offset_ticks(offset:float=.0, sampling_rate:float=1e9):
+    """
+    Convert a time offset into an integer number of sample clock ticks,
+    rounded to the nearest tick.
+
+    Parameters
+    ----------
+    offset : float, optional
+        Time offset, positive or negative. The default is .0.
+    sampling_rate : float, optional
+        Sampling rate for DAC. The default is 1e9 (Suggested).
+
+    Returns
+    -------
+    int
+
+    """
+    return int(np.rint(offset * sampling_rate))
+
+
+def get_points(span:float=.0, sampling_rate:float=1e9):
+    """
+    Number of points of a formatted timeline.
+
+    Parameters
+    ----------
+    span : float, optional
+        Overall length of timeline. The default is .0.
+    sampling_rate : float, optional
+        Sampling rate for DAC. The default is 1e9 (Suggested).
+
+    Returns
+    -------
+    int
+
+    """
+    return get_ticks(span, sampling_rate) + 1
+
+
+class TimelineCache(object):
+
+    def __init__(self, maxbytes=16 * 2**20, limit=2**20):
+        """
+        Bounded LRU pool of interned timelines. Each (points, sampling rate)
+        pair maps to exactly one read-only array, so matching timelines share
+        their memory. The least recently used timelines are evicted once the
+        stored arrays exceed maxbytes, and timelines larger than limit bytes,
+        e.g. those of compiled circuits, are created without interning.
+
+        Parameters
+        ----------
+        maxbytes : int, optional
+            Memory budget in bytes. The default is 16 MiB.
+        limit : int, optional
+            Size in bytes of the largest interned timeline. The default is
+            1 MiB.
+
+        """
+        self.maxbytes = maxbytes
+        self.limit = limit
+        self.nbytes = 0
+        self._pool = OrderedDict()
+
+    def __len__(self):
+        return len(self._pool)
+
+    def get(self, points, sampling_rate):
+        """
+        Return the interned timeline with given number of points and sampling
+        rate, creating it on a cache miss.
+
+        Parameters
+        ----------
+        points : int
+            Number of points.
+        sampling_rate : float
+            Sampling rate for DAC.
+
+        Returns
+        -------
+        np.array
+            Read-only timeline.
+
+        """
+        key = (points, sampling_rate)
+        try:
+            self._pool.move_to_end(key)
+            return self._pool[key]
+        except KeyError:
+            pass
+        x = np.linspace(0, points - 1, points) / sampling_rate
+        x.flags.writeable = False
+        if x.nbytes > min(self.limit, self.maxbytes):
+            return x
+        self._pool[key] = x
+        self.nbytes += x.nbytes
+        while self.nbytes > self.maxbytes:
+            _, evicted = self._pool.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return x
+
+    def clear(self):
+        self._pool.clear()
+        self.nbytes = 0
+
+
+timeline_cache = TimelineCache()
+
+
+class ShapeCache(object):
+
+    def __init__(self, maxbytes=64 * 2**20):
+        """
+        Content-addressed LRU pool of evaluated shape functions. Entries are
+        keyed by the generator content (function, X, Y and appendRule) and
+        hold read-only y data. The least recently used entries are evicted
+        once the stored y data exceed maxbytes.
+
+        Parameters
+        ----------
+        maxbytes : int, optional
+            Memory budget in bytes. Set 0 to disable caching. The default is
+            64 MiB.
+
+        """
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.nbytes = 0
+        self._pool = OrderedDict()
+
+    def __len__(self):
+        return len(self._pool)
+
+    def __str__(self):
+        return f"entries: {len(self)}\n" + \
+            f"size: {self.nbytes}/{self.maxbytes} bytes\n" + \
+            f"hits: {self.hits}\n" + \
+            f"misses: {self.misses}"
+
+    def get(self, key):
+        """
+        Look up y data by key and update the hit/miss counters.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable generator content.
+
+        Returns
+        -------
+        np.array or None
+            Read-only y data, None on a cache miss.
+
+        """
+        try:
+            self._pool.move_to_end(key)
+        except KeyError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._pool[key]
+
+    def put(self, key, y):
+        """
+        Store y data as read-only and evict entries beyond the budget.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable generator content.
+        y : np.array
+            Evaluated shape function.
+
+        Returns
+        -------
+        np.array
+            Read-only y data.
+
+        """
+        y = np.asarray(y)
+        y.flags.writeable = False
+        if y.nbytes > self.maxbytes:
+            return y
+        self._pool[key] = y
+        self.nbytes += y.nbytes
+        while self.nbytes > self.maxbytes:
+            _, evicted = self._pool.popitem(last=False)
+            self.nbytes -= evicted.nbytes
+        return y
+
+    def clear(self):
+        self._pool.clear()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+
+shape_cache = ShapeCache()
 
 
 def get_x(span:float=.0, sampling_rate:float=1e9):
     """
-    Formatted timeline creation.
+    Formatted timeline creation. Timelines are interned in timeline_cache,
+    so the same (span, sampling_rate) returns the same read-only array.
 
     Parameters
     ----------
@@ -302,8 +621,7 @@ def get_x(span:float=.0, sampling_rate:float=1e9):
     np.array
 
     """
-    points = int(round(span * sampling_rate, 3)) + 1
-    return np.linspace(0, points - 1, points) / sampling_rate
+    return timeline_cache.get(get_points(span, sampling_rate), sampling_rate)
 
 
 function_mappings = {
@@ -321,6 +639,15 @@ function_mappings = {
     }
 
 
+@lru_cache(maxsize=None)
+def _argNames(func):
+    """
+    Names of shape function arguments except the timeline.
+
+    """
+    return showarg(func).args[1:]
+
+
 def setFunc(
         func, funcArg,
         span=.0, sampling_rate=1e9,
@@ -350,7 +677,7 @@ def setFunc(
     """
     if isinstance(func, str):
         func = function_mappings[func]
-    argNames = showarg(func).args[1:]
+    argNames = _argNames(func)
     if isinstance(funcArg, dict):
         funcArg = [funcArg[arg] for arg in argNames]
     generator = {
@@ -392,16 +719,82 @@ def parse(generator):
     func = generator['function']
     if isinstance(func, str):
         func = function_mappings[func]
-    argNames = showarg(func).args[1:]
-    funcArg = [generator['Y'][arg] for arg in argNames]
-    y = func(x, *funcArg)
+    funcArg = [generator['Y'][arg] for arg in _argNames(func)]
     # name
     name = generator['name']
     # appendRule
     appendRule = generator['appendRule']
+    key = (func, span, sampling_rate, *funcArg, *appendRule)
+    try:
+        y = shape_cache.get(key)
+    except TypeError:   # unhashable arguments, skip caching
+        return x, func(x, *funcArg), name, appendRule
+    if y is None:
+        y = shape_cache.put(key, func(x, *funcArg))
     return x, y, name, appendRule
 
 
+def sweep(generator, **sweepArgs):
+    """
+    Evaluate the shape function of a generator over arrays of argument
+    values in a single broadcast call, the piecewise shape functions
+    included. Shape functions which cannot be broadcast are evaluated row by
+    row into the same output block.
+
+    Parameters
+    ----------
+    generator : dict
+        Discription dict for wave generation, providing the timeline and the
+        values of the arguments not swept.
+    **sweepArgs : np.array
+        Arrays of values for the swept arguments, keyed by argument name.
+        All arrays are broadcast together into one sweep axis.
+
+    Returns
+    -------
+    x : np.array
+        x (time) data.
+    y : np.array
+        Read-only 2-D (sweep, time) block of y (amplitude) data.
+    name : str
+        Name of wave.
+    appendRule : list
+        Concatenation rule for waves.
+
+    """
+    # x
+    x = get_x(generator['X']['span'], generator['X']['sampling_rate'])
+    # y
+    func = generator['function']
+    if isinstance(func, str):
+        func = function_mappings[func]
+    argNames = _argNames(func)
+    unknown = set(sweepArgs) - set(argNames)
+    if unknown:
+        raise KeyError(f'Unknown arguments for {func.__name__}: {unknown}')
+    values = np.broadcast_arrays(*[
+        np.ravel(val) for val in sweepArgs.values()
+        ])
+    sweepArgs = dict(zip(sweepArgs, values))
+    rows = len(values[0]) if values else 1
+    funcArg = [
+        sweepArgs[arg][:, np.newaxis] if arg in sweepArgs
+        else generator['Y'][arg] for arg in argNames
+        ]
+    try:
+        y = np.asarray(func(x[np.newaxis, :], *funcArg))
+        if y.shape != (rows, x.size):
+            raise ValueError('Shape function is not broadcastable')
+    except (ValueError, TypeError, IndexError):
+        y = np.stack([
+            func(x, *[
+                arg[row, 0] if np.ndim(arg) == 2 else arg for arg in funcArg
+                ]) for row in range(rows)
+            ])
+    y.flags.writeable = False
+    return x, y, generator['name'], generator['appendRule']
+
+
 if __name__ == '__main__':
     # a = setFunc('gaussian', [5e-6, 1e-6], 10e-6)
     a = setFunc('gaussian', {'peak_x': 5e-6, 'sigma':1e-6}, 10e-6)
@@ -7,13 +7,17 @@ Created on Mon Sep  6 02:01:34 2021
 
 from scipy.signal import welch
 from scipy.fft import fft, ifft, fftfreq, fftshift
-from copy import deepcopy
+from copy import copy
+from importlib import import_module
+import json
 import pickle
+import struct
 import numpy as np
 import matplotlib.pyplot as plt
 import tkinter
 from tkinter import filedialog, Tk, Frame, Canvas, Scrollbar
 from io import BytesIO
+from .ShapeModule import timeline_cache
 
 
 # Plotting module
@@ -140,9 +144,155 @@ def simple_scrollable_window(windowSize='800x600'):
 
 
 # Storage module
+# File layout: magic | version (uint32) | header size (uint64) | JSON header |
+# sample blocks, each aligned to BLOCK_ALIGN bytes from the start of the data
+# section. The header holds the object table and the (dtype, shape, offset)
+# of every block, so loading only parses the header and maps the blocks.
+FILE_MAGIC = b'QCMP'
+FILE_VERSION = 1
+BLOCK_ALIGN = 64
+_PREAMBLE = struct.Struct('<4sIQ')
+
+
+class Storable(object):
+    """
+    Base class of objects that can be saved in the binary file format. Each
+    subclass is registered by its full name and implements _dump()/_restore()
+    to convert its attributes into a JSON-compatible state dict, with sample
+    data stored as blocks and other Storable objects stored as references.
+
+    """
+    _registry = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        Storable._registry[f'{cls.__module__}.{cls.__qualname__}'] = cls
+
+    def _dump(self, writer):
+        raise NotImplementedError(
+            f'{self.__class__.__name__} does not implement _dump'
+            )
+
+    @classmethod
+    def _restore(cls, state, reader):
+        raise NotImplementedError(
+            f'{cls.__name__} does not implement _restore'
+            )
+
+    @classmethod
+    def _lookup(cls, typename):
+        """
+        Get the registered class by its full name, importing its module if
+        necessary. Only Storable classes can be returned.
+
+        """
+        if typename not in cls._registry:
+            import_module(typename.rsplit('.', 1)[0])
+        try:
+            return cls._registry[typename]
+        except KeyError:
+            raise TypeError(f'Unknown storable type: {typename}')
+
+
+class _Writer(object):
+    """
+    Serializer of Storable objects. Objects and arrays are both stored once
+    per reference, so shared gates and read-only buffers stay shared.
+
+    """
+
+    def __init__(self):
+        self.objects = []
+        self.blocks = []
+        self._data = []
+        self._keep = []
+        self._objIdx = {}
+        self._arrIdx = {}
+        self._size = 0
+
+    def ref(self, obj):
+        key = id(obj)
+        if key not in self._objIdx:
+            cls = obj.__class__
+            self._objIdx[key] = len(self.objects)
+            self.objects += [None]
+            self.objects[self._objIdx[key]] = {
+                'type': f'{cls.__module__}.{cls.__qualname__}',
+                'state': obj._dump(self)
+                }
+            # keep obj alive, so its id is not reused while writing
+            self._keep += [obj]
+        return self._objIdx[key]
+
+    def array(self, array):
+        key = id(array)
+        if key not in self._arrIdx:
+            data = np.ascontiguousarray(array)
+            if data.dtype.hasobject:
+                raise TypeError('Object arrays cannot be stored')
+            self._arrIdx[key] = len(self.blocks)
+            self.blocks += [{
+                'dtype': data.dtype.str,
+                'shape': list(data.shape),
+                'offset': self._size
+                }]
+            self._data += [data]
+            self._keep += [array]
+            self._size += -(-data.nbytes // BLOCK_ALIGN) * BLOCK_ALIGN
+        return self._arrIdx[key]
+
+    def write(self, filename, root):
+        root = self.ref(root)
+        # numpy scalars are converted by the default hook
+        header = json.dumps({
+            'root': root, 'objects': self.objects, 'blocks': self.blocks
+            }, default=lambda val: val.item()).encode('utf-8')
+        start = -(-(_PREAMBLE.size + len(header)) // BLOCK_ALIGN) * BLOCK_ALIGN
+        with open(filename, 'wb') as f:
+            f.write(_PREAMBLE.pack(FILE_MAGIC, FILE_VERSION, len(header)))
+            f.write(header)
+            for block, data in zip(self.blocks, self._data):
+                f.seek(start + block['offset'])
+                data.tofile(f)
+            f.truncate(start + self._size)
+
+
+class _Reader(object):
+    """
+    Deserializer of the binary file format. Sample blocks are returned as
+    read-only views of a single memory map of the file, so the data are only
+    read from disk when accessed.
+
+    """
+
+    def __init__(self, filename, header, start):
+        self._map = np.memmap(filename, dtype=np.uint8, mode='r')
+        self._start = start
+        self._objects = header['objects']
+        self._blocks = header['blocks']
+        self._restored = {}
+
+    def obj(self, ref):
+        if ref not in self._restored:
+            entry = self._objects[ref]
+            self._restored[ref] = Storable._lookup(entry['type'])._restore(
+                entry['state'], self
+                )
+        return self._restored[ref]
+
+    def array(self, ref):
+        block = self._blocks[ref]
+        dtype = np.dtype(block['dtype'])
+        begin = self._start + block['offset']
+        count = int(np.prod(block['shape'], dtype=np.int64))
+        data = np.asarray(self._map[begin:begin + count * dtype.itemsize])
+        return data.view(dtype).reshape(block['shape'])
+
+
 def save(ext, *args):
     """
-    Save objects to files with specified extension.
+    Save objects to files with specified extension in the binary file
+    format.
 
     Parameters
     ----------
@@ -157,15 +307,16 @@ def save(ext, *args):
             obj.name = input(
                 f'Empty name string for {i}th item, set object name:'
                 )
-        with open(f'{obj.name}' + ext, 'wb') as f:
-            pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+        _Writer().write(f'{obj.name}' + ext, obj)
 
 
 def load(ext, *args):
     """
     Load object from files with 2 methods: The 'dialog' mode using a dialog
     box to import filenames while 'arg' mode using file names given in
-    *args. The mode is specified by ext variable.
+    *args. The mode is specified by ext variable. Sample data are memory
+    mapped and read on access. Files saved by older versions with pickle are
+    still accepted.
 
     Parameters
     ----------
@@ -185,13 +336,24 @@ def load(ext, *args):
         Loaded objects in tuple.
 
     """
-    if ext:
+    if ext and not args:
         args = get_path(ext, 'Select object files')
 
     objList = []
     for filename in args:
         with open(filename, 'rb') as f:
-            objList += [pickle.load(f)]
+            preamble = f.read(_PREAMBLE.size)
+            if preamble[:len(FILE_MAGIC)] != FILE_MAGIC:
+                # legacy pickle file
+                f.seek(0)
+                objList += [pickle.load(f)]
+                continue
+            _, version, size = _PREAMBLE.unpack(preamble)
+            if version > FILE_VERSION:
+                raise ValueError(f'Unsupported file version: {version}')
+            header = json.loads(f.read(size).decode('utf-8'))
+        start = -(-(_PREAMBLE.size + size) // BLOCK_ALIGN) * BLOCK_ALIGN
+        objList += [_Reader(filename, header, start).obj(header['root'])]
     return *objList,
 
 
@@ -223,22 +385,31 @@ def get_path(ext='', title='Select item'):
         title=title)
 
 
-class GenericWave(object):
-    EFF_FREQ_DIGIT = 5
-    EFF_TIME_DIGIT = 0 + 9
+class GenericWave(Storable):
+    # significant digits of sampling rates derived from explicit timelines
+    EFF_FREQ_DIGIT = 12
 
     def __init__(self):
-        # fundamental attributes
-        self._x
+        # fundamental attributes, the timeline is implicit:
+        # x = t0 + arange(n) / sampling_rate
+        self._t0
+        self._n
+        self._sampling_rate
         self._y
         self._name
         pass
 
+    @property
+    def ticks(self):
+        """
+        Span in integer ticks of the sample clock.
+
+        """
+        return max(len(self) - 1, 0)
+
     @property
     def span(self):
-        return round(
-            self.x[-1] - self.x[0], self.__class__.EFF_TIME_DIGIT
-            )
+        return self.ticks / self.sampling_rate
 
     @property
     def name(self):
@@ -248,9 +419,23 @@ class GenericWave(object):
     def name(self, name=''):
         self._name = name
 
+    @property
+    def t0(self):
+        return self._t0
+
+    @property
+    def sampling_rate(self):
+        return self._sampling_rate
+
     @property
     def x(self):
-        return self._x
+        """
+        Timeline built on demand from (t0, number of points, sampling rate).
+        The array is shared through the interned timeline cache when t0 is 0.
+
+        """
+        x = timeline_cache.get(len(self), self.sampling_rate)
+        return x + self.t0 if self.t0 else x
 
     @property
     def y(self):
@@ -266,20 +451,16 @@ class GenericWave(object):
 
     @property
     def dx(self):
-        try:
-            return round(
-                self.x[1] - self.x[0], self.__class__.EFF_TIME_DIGIT
-                )
-        except(IndexError):
+        if len(self) < 2:
             return 0
+        return 1 / self.sampling_rate
 
     @property
     def df(self):
-        try:
-            return round(1 / self.dx, self.__class__.EFF_FREQ_DIGIT)
-        except(ZeroDivisionError):
+        if len(self) < 2:
             print('unable to define frequency axis wirh 1 point')
             return 0
+        return self.sampling_rate
 
     @property
     def xaxis(self):
@@ -303,7 +484,29 @@ class GenericWave(object):
             Number of points in the object.
 
         """
-        return len(self.x)
+        return self._n
+
+    def __setstate__(self, state):
+        # convert objects pickled with an explicit timeline array
+        if '_x' in state:
+            x = np.asarray(state.pop('_x'))
+            state.setdefault('_t0', x[0] if x.size else 0.)
+            state['_n'] = x.size
+            state['_sampling_rate'] = self.__class__._rateOf(x)
+        self.__dict__.update(state)
+
+    @classmethod
+    def _rateOf(cls, x):
+        """
+        Backend method to derive the sampling rate of an explicit timeline.
+        The rate is rounded to EFF_FREQ_DIGIT significant digits, so the
+        floating point error of time points far from 0 does not leak into it.
+
+        """
+        if len(x) < 2:
+            return 1e9
+        rate = (len(x) - 1) / (x[-1] - x[0])
+        return float(f'{rate:.{cls.EFF_FREQ_DIGIT}g}')
 
     def __max__(self, *gwObj):
         """
@@ -443,6 +646,26 @@ class GenericWave(object):
         """
         return len(self) > len(gwObj)
 
+    def sameTimeline(self, gwObj):
+        """
+        Check whether 2 objects are on the same timeline. Timelines are
+        implicit, so this compares (t0, number of points, sampling rate)
+        without building x.
+
+        Parameters
+        ----------
+        gwObj : GenericWave
+            Object to be compared.
+
+        Returns
+        -------
+        Boolean
+            True if both objects share the same timeline.
+
+        """
+        return (self.t0, len(self), self.sampling_rate) == \
+            (gwObj.t0, len(gwObj), gwObj.sampling_rate)
+
     def __matmul__(self, xList=[]):
         """
         Return the corresponding y at the indicated x by interpolation. Denoted
@@ -564,10 +787,12 @@ class GenericWave(object):
         return load('.wf', *args)
 
 
-class GenericGate(object):
+class GenericGate(Storable):
 
     def __init__(self, *qcObj):
-        temp = deepcopy(qcObj)
+        # the gate owns shallow copies of the channels, so aligning them
+        # leaves the inputs untouched without duplicating sample data
+        temp = [copy(qcObj0) for qcObj0 in qcObj]
         temp = temp[0].__class__.alignQubitChannels(*temp)
         self._qubitDict = {qcObj0.name: qcObj0 for qcObj0 in temp}
         self._name = ''
@@ -620,6 +845,24 @@ class GenericGate(object):
         """
         return self._qubitDict[qbname]
 
+    def _dump(self, writer):
+        return {
+            'qubitDict': [
+                [key, writer.ref(qcObj)]
+                for key, qcObj in self._qubitDict.items()
+                ],
+            'name': self._name
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        gateObj = cls.__new__(cls)
+        gateObj._qubitDict = {
+            key: reader.obj(ref) for key, ref in state['qubitDict']
+            }
+        gateObj._name = state['name']
+        return gateObj
+
     @classmethod
     def save(cls, *args):
         save('.gate', *args)
@@ -11,8 +11,23 @@ for set / get vs IDE:
 # import TemplateModule as tpm
 from . import TemplateModule as tpm
 import numpy as np
-from copy import deepcopy
-from .ShapeModule import parse, setFunc
+from copy import copy, deepcopy
+from itertools import count
+from .ShapeModule import parse, sweep, get_points, get_ticks, get_offset_ticks
+
+
+# source of the stamps marking the changes of Waveform objects
+_stamps = count(1)
+
+
+def _readonly(array):
+    """
+    Return the array (as numpy.array) with its writeable flag cleared.
+
+    """
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
 
 
 class Wave(tpm.GenericWave):
@@ -40,13 +55,118 @@ class Wave(tpm.GenericWave):
         """
         if generator is None:
             temp = deepcopy(properties)
-            self._x = temp['x']
-            self._y = temp['y']
+            x = np.asarray(temp['x'])
+            self._y = _readonly(temp['y'])
+            self._t0 = x[0] if x.size else 0.
+            self._n = len(self._y)
+            self._sampling_rate = self.__class__._rateOf(x)
             self._name = temp['name']
             self._appendRule = temp['appendRule']
             return
-        self._x, self._y, self._name, self._appendRule = parse(generator)
-        
+        _, y, self._name, self._appendRule = parse(generator)
+        self._y = _readonly(y)
+        self._t0 = 0.
+        self._n = len(y)
+        self._sampling_rate = generator['X']['sampling_rate']
+
+    @classmethod
+    def _fromProperties(cls, properties):
+        """
+        Backend constructor for the derived Wave objects. The arrays in
+        properties are adopted without copying and set to read-only, so the
+        new object may share its y (view) with the source Wave object while
+        the timeline is carried over as (t0, sampling rate).
+
+        Parameters
+        ----------
+        cls : Wave class
+            Wave class object.
+        properties : dict
+            Dict with 't0', 'sampling_rate', 'y', 'name' and 'appendRule'
+            keys. The y array must not be modified afterwards by the caller.
+
+        Returns
+        -------
+        Wave
+            Object with a new reference.
+
+        """
+        waveObj = cls.__new__(cls)
+        waveObj._y = _readonly(properties['y'])
+        waveObj._t0 = properties['t0']
+        waveObj._n = len(waveObj._y)
+        waveObj._sampling_rate = properties['sampling_rate']
+        waveObj._name = properties['name']
+        waveObj._appendRule = properties['appendRule']
+        return waveObj
+
+    @classmethod
+    def sweep(cls, generator, **sweepArgs):
+        """
+        Parameter sweep of a generator. The shape function is evaluated once
+        for all values (see ShapeModule.sweep) and each row of the resulting
+        block is wrapped into a Wave object as a view, without copying.
+
+        Parameters
+        ----------
+        cls : Wave class
+            Wave class object.
+        generator : dict
+            Discription dict for wave generation.
+        **sweepArgs : np.array
+            Arrays of values for the swept arguments, keyed by argument name.
+
+        Returns
+        -------
+        y : np.array
+            Read-only 2-D (sweep, time) block of y (amplitude) data.
+        list
+            List of Wave objects, one per row of y.
+
+        """
+        _, y, name, appendRule = sweep(generator, **sweepArgs)
+        return y, [
+            cls._fromProperties({
+                't0': 0.,
+                'sampling_rate': generator['X']['sampling_rate'],
+                'y': row,
+                'name': name,
+                'appendRule': list(appendRule)
+                }) for row in y
+            ]
+
+    def __deepcopy__(self, memo):
+        """
+        Copy-on-write duplication. The x-y arrays are read-only, so the copy
+        shares them with the original while the other attributes are
+        duplicated.
+
+        Returns
+        -------
+        Wave
+            Object with a new reference.
+
+        """
+        copied = self.__class__.__new__(self.__class__)
+        memo[id(self)] = copied
+        copied.__dict__.update(self.__dict__)
+        copied._appendRule = list(self._appendRule)
+        return copied
+
+    def _dump(self, writer):
+        return {
+            't0': self._t0,
+            'sampling_rate': self._sampling_rate,
+            'y': writer.array(self._y),
+            'name': self._name,
+            'appendRule': list(self._appendRule)
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        return cls._fromProperties({
+            **state, 'y': reader.array(state['y'])
+            })
 
     @property
     def appendRule(self):
@@ -116,10 +236,11 @@ class Wave(tpm.GenericWave):
         """
         properties = {'name': self.name,
                       'y': self.y[::-1],
-                      'x': self.x,
-                      'appendRule': self.appendRule
+                      't0': self.t0,
+                      'sampling_rate': self.sampling_rate,
+                      'appendRule': list(self.appendRule)
                       }
-        return Wave(properties=properties)
+        return Wave._fromProperties(properties)
 
     def __add__(self, waveObj):
         """
@@ -139,27 +260,29 @@ class Wave(tpm.GenericWave):
         if not isinstance(waveObj, Wave):
             properties = {'name': self.name,
                           'y': self.y + waveObj,
-                          'x': self.x,
-                          'appendRule': self.appendRule
+                          't0': self.t0,
+                          'sampling_rate': self.sampling_rate,
+                          'appendRule': list(self.appendRule)
                           }
-            return Wave(properties=properties)
+            return Wave._fromProperties(properties)
         longer = max(self, waveObj)
         if self is waveObj:
             shorter = self
         else:
             shorter = [obj for obj in [self, waveObj] if obj is not longer][0]
-        x, length = longer.x, len(shorter)
+        length = len(shorter)
         y = np.concatenate((
             longer.y[:length] + shorter.y[:length], longer.y[length:]
             ))
         properties = {'name': self.name,
-                      'x': x,
+                      't0': longer.t0,
+                      'sampling_rate': longer.sampling_rate,
                       'y': y,
                       'appendRule': [i or j for i, j in zip(
                                       self.appendRule, waveObj.appendRule
                                       )]
                       }
-        return Wave(properties=properties)
+        return Wave._fromProperties(properties)
 
     def __radd__(self, other):
         # Image method for __add__
@@ -184,27 +307,29 @@ class Wave(tpm.GenericWave):
         if not isinstance(waveObj, Wave):
             properties = {'name': self.name,
                           'y': self.y - waveObj,
-                          'x': self.x,
-                          'appendRule': self.appendRule
+                          't0': self.t0,
+                          'sampling_rate': self.sampling_rate,
+                          'appendRule': list(self.appendRule)
                           }
-            return Wave(properties=properties)
+            return Wave._fromProperties(properties)
         longer = max(self, waveObj)
         if self is waveObj:
             shorter = self
         else:
             shorter = [obj for obj in [self, waveObj] if obj is not longer][0]
-        x, length = longer.x, len(shorter)
+        length = len(shorter)
         y = np.concatenate((
             longer.y[:length] - shorter.y[:length], longer.y[length:]
             ))
         properties = {'name': self.name,
-                      'x': x,
+                      't0': longer.t0,
+                      'sampling_rate': longer.sampling_rate,
                       'y': y,
                       'appendRule': [i or j for i, j in zip(
                                       self.appendRule, waveObj.appendRule
                                       )]
                       }
-        return Wave(properties=properties)
+        return Wave._fromProperties(properties)
 
     def __rsub__(self, other):
         # Image method for __sub__
@@ -229,27 +354,29 @@ class Wave(tpm.GenericWave):
         if not isinstance(waveObj, Wave):
             properties = {'name': self.name,
                           'y': self.y * waveObj,
-                          'x': self.x,
-                          'appendRule': self.appendRule
+                          't0': self.t0,
+                          'sampling_rate': self.sampling_rate,
+                          'appendRule': list(self.appendRule)
                           }
-            return Wave(properties=properties)
+            return Wave._fromProperties(properties)
         longer = max(self, waveObj)
         if self is waveObj:
             shorter = self
         else:
             shorter = [obj for obj in [self, waveObj] if obj is not longer][0]
-        x, length = longer.x, len(shorter)
+        length = len(shorter)
         y = np.concatenate((
             longer.y[:length] * shorter.y[:length], longer.y[length:]
             ))
         properties = {'name': self.name,
-                      'x': x,
+                      't0': longer.t0,
+                      'sampling_rate': longer.sampling_rate,
                       'y': y,
                       'appendRule': [i or j for i, j in zip(
                                       self.appendRule, waveObj.appendRule
                                       )]
                       }
-        return Wave(properties=properties)
+        return Wave._fromProperties(properties)
 
     def __rmul__(self, other):
         # Image method for __mul__
@@ -272,12 +399,13 @@ class Wave(tpm.GenericWave):
 
         """
         if not isinstance(number, Wave):
-            properties = {'name': self.faxisname,
+            properties = {'name': self.name,
                           'y': self.y / number,
-                          'x': self.x,
-                          'appendRule': self.appendRule
+                          't0': self.t0,
+                          'sampling_rate': self.sampling_rate,
+                          'appendRule': list(self.appendRule)
                           }
-            return Wave(properties=properties)
+            return Wave._fromProperties(properties)
         else:
             print('Divider must be numeric')
             return self
@@ -314,13 +442,77 @@ class Wave(tpm.GenericWave):
         """
         properties = {'name': self.name,
                       'y': abs(self.y),
-                      'x': self.x,
-                      'appendRule': self.appendRule
+                      't0': self.t0,
+                      'sampling_rate': self.sampling_rate,
+                      'appendRule': list(self.appendRule)
                       }
-        return Wave(properties=properties)
+        return Wave._fromProperties(properties)
+
+
+class NullWave(Wave):
+
+    def __init__(self, span=.0, sampling_rate=1e9, appendRule=[False, False],
+                 ticks=None):
+        """
+        Symbolic block of 0s. Only the timeline (span and sampling rate) and
+        the append rule are stored, the y data are generated on demand and
+        Waveform synthesis writes the 0s straight into its output buffer.
+
+        Parameters
+        ----------
+        span : float, optional
+            Time span. The default is .0.
+        sampling_rate : float, optional
+            Sampling rate for DAC. The default is 1e9 (Suggested).
+        appendRule : list, optional
+            List of append rules. The default is [False, False].
+        ticks : int, optional
+            Time span in ticks of the sample clock, overrides span if given.
+            The default is None.
+
+        Returns
+        -------
+        NullWave
+            An encapsulated NullWave object.
+
+        """
+        if ticks is None:
+            ticks = get_ticks(span, sampling_rate)
+        self._t0 = 0.
+        self._n = ticks + 1
+        self._sampling_rate = sampling_rate
+        self._name = 'null'
+        self._appendRule = appendRule
+
+    @property
+    def y(self):
+        return np.zeros(len(self))
+
+    def __neg__(self):
+        return deepcopy(self)
+
+    def __abs__(self):
+        return deepcopy(self)
+
+    def _dump(self, writer):
+        # only the timeline is stored
+        return {
+            'ticks': self.ticks,
+            'sampling_rate': self._sampling_rate,
+            'appendRule': list(self._appendRule)
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        return cls(
+            sampling_rate=state['sampling_rate'],
+            appendRule=state['appendRule'],
+            ticks=state['ticks']
+            )
 
 
 class Waveform(tpm.GenericWave):
+    _stamp = 0
 
     def __init__(self, waveObjList=[], name=''):
         """
@@ -342,7 +534,7 @@ class Waveform(tpm.GenericWave):
         """
         self._waveList = deepcopy(waveObjList)
         self._name = deepcopy(name)
-        self._y, self._x = self.__class__._synthesize(self._waveList)
+        self._refresh()
 
     @property
     def waveList(self):
@@ -373,7 +565,156 @@ class Waveform(tpm.GenericWave):
         if not waveObjList:
             raise ValueError("waveObjList cannot be empty")
         self._waveList = waveObjList
-        self._y, self._x = self.__class__._synthesize(self._waveList)
+        self._refresh()
+
+    @classmethod
+    def _fromWaveList(cls, waveList, name=''):
+        """
+        Backend method to build a Waveform object on a list of Wave objects
+        without copying them. Waves are read-only, so they can be shared.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class.
+        waveList : list
+            Ordered list of Wave objects. The list itself is adopted.
+        name : string, optional
+            Name of waveform. The default is ''.
+
+        Returns
+        -------
+        Waveform
+            New waveform object.
+
+        """
+        obj = cls.__new__(cls)
+        obj._waveList = waveList
+        obj._name = name
+        obj._refresh()
+        return obj
+
+    def _refresh(self):
+        """
+        Backend method to mark the y data and the timeline as outdated once
+        the wave list is changed. Both are resolved on first access, so a
+        series of edits costs a single synthesis. A new stamp is issued, so
+        the circuits the waveform is placed in see the change.
+
+        """
+        self._y = None
+        self._n = None
+        self._stamp = self.__class__._issue()
+
+    def _resolve(self):
+        """
+        Backend method to resolve the timeline from the wave list, without
+        synthesizing y data.
+
+        """
+        self._n, self._t0, self._sampling_rate = \
+            self.__class__._timeline(self._waveList)
+
+    @classmethod
+    def _issue(cls):
+        """
+        Backend method to issue a new stamp. Stamps are issued in increasing
+        order, so a waveform with a stamp above the one issued at some point
+        was changed afterwards.
+
+        """
+        return next(_stamps)
+
+    @property
+    def t0(self):
+        if self._n is None:
+            self._resolve()
+        return self._t0
+
+    @property
+    def sampling_rate(self):
+        if self._n is None:
+            self._resolve()
+        return self._sampling_rate
+
+    @property
+    def y(self):
+        """
+        Get method for y data, synthesized from the wave list on first access
+        after a change.
+
+        Returns
+        -------
+        numpy.array
+            Read-only y data.
+
+        """
+        if self._y is None:
+            y, self._t0, self._sampling_rate = \
+                self.__class__._synthesize(self._waveList)
+            self._y = _readonly(y)
+            self._n = len(self._y)
+        return self._y
+
+    def __len__(self):
+        if self._n is None:
+            self._resolve()
+        return self._n
+
+    def __copy__(self):
+        """
+        Shallow duplication. The copy has its own wave list, while the Wave
+        objects and the synthesized read-only y data are shared.
+
+        Returns
+        -------
+        Waveform
+            Object with a new reference.
+
+        """
+        copied = self.__class__.__new__(self.__class__)
+        copied.__dict__.update(self.__dict__)
+        copied._waveList = list(self._waveList)
+        return copied
+
+    def __deepcopy__(self, memo):
+        """
+        Copy-on-write duplication. Same as copy() but the Wave objects are
+        duplicated as well; no sample data is copied.
+
+        Returns
+        -------
+        Waveform
+            Object with a new reference.
+
+        """
+        copied = copy(self)
+        memo[id(self)] = copied
+        copied._waveList = deepcopy(self._waveList, memo)
+        return copied
+
+    def _dump(self, writer):
+        # the synthesized y data are stored too, so they can be read without
+        # synthesis after loading
+        return {
+            'waveList': [writer.ref(waveObj) for waveObj in self._waveList],
+            'name': self._name,
+            't0': self.t0,
+            'sampling_rate': self.sampling_rate,
+            'y': writer.array(self.y)
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        obj = cls.__new__(cls)
+        obj._waveList = [reader.obj(ref) for ref in state['waveList']]
+        obj._name = state['name']
+        obj._t0 = state['t0']
+        obj._sampling_rate = state['sampling_rate']
+        obj._y = reader.array(state['y'])
+        obj._n = len(obj._y)
+        obj._stamp = cls._issue()
+        return obj
 
     @property
     def appendRule(self):
@@ -671,12 +1012,12 @@ class Waveform(tpm.GenericWave):
         """
         if waveform == self:
             return
-        samp_rate = self.df
+        samp_rate = self.sampling_rate
         if use_1st_head ^ align_2nd_head:
-            addListA = self.__class__._nullBlock(
-                self.span, samp_rate, self.appendRule)
-            addListB = self.__class__._nullBlock(
-                waveform.span, samp_rate, waveform.appendRule)
+            addListA = self.__class__._nullTicks(
+                self.ticks, samp_rate, self.appendRule)
+            addListB = self.__class__._nullTicks(
+                waveform.ticks, samp_rate, waveform.appendRule)
             if use_1st_head:
                 # print('T-F')
                 self.waveList = addListB + self.waveList
@@ -686,20 +1027,19 @@ class Waveform(tpm.GenericWave):
                 self.waveList = self.waveList + addListB
                 waveform.waveList = addListA + waveform.waveList
         else:
-            span = round(abs(self.span - waveform.span),
-                         self.__class__.EFF_TIME_DIGIT)
+            ticks = abs(len(self) - len(waveform))
             # distinguish longer & shorter waveform
             longer = max(self, waveform)
             shorter = min(self, waveform)
             if use_1st_head:
                 # print('T-T')
-                addList = self.__class__._nullBlock(
-                    span, samp_rate, [True, longer.appendRule[-1]])
+                addList = self.__class__._nullTicks(
+                    ticks, samp_rate, [True, longer.appendRule[-1]])
                 shorter.waveList = shorter.waveList + addList
             else:
                 # print('F-F')
-                addList = self.__class__._nullBlock(
-                    span, samp_rate, [longer.appendRule[0], True])
+                addList = self.__class__._nullTicks(
+                    ticks, samp_rate, [longer.appendRule[0], True])
                 shorter.waveList = addList + shorter.waveList
 
     def offset(self, offset=0.):
@@ -714,33 +1054,75 @@ class Waveform(tpm.GenericWave):
 
         Returns
         -------
-        None.
+        Waveform
+            Offsetted result with a new reference.
+
+        """
+        return self._offsetTicks(get_offset_ticks(offset, self.sampling_rate))
+
+    def _offsetTicks(self, ticks=0):
+        """
+        Backend function of offset() with the offset given in integer ticks
+        of the sample clock.
+
+        Parameters
+        ----------
+        ticks : int, optional
+            Positive/negative value pads 0s at the head/tail. The default is
+            0.
+
+        Returns
+        -------
+        Waveform
+            Offsetted result with a new reference.
 
         """
-        offset = round(offset, self.__class__.EFF_TIME_DIGIT)
-        if abs(offset) < self.dx:
+        if ticks == 0:
             return self
-        span = abs(offset)
-        samp_rate = self.df
-        if offset > 0:
+        samp_rate = self.sampling_rate
+        if ticks > 0:
             return Waveform(
-                self.__class__._nullBlock(
-                    span, samp_rate, [self.appendRule[0], False]
+                self.__class__._nullTicks(
+                    ticks, samp_rate, [self.appendRule[0], False]
                     ) + self.waveList
                 )
         else:
             return Waveform(
-                self.waveList + self.__class__._nullBlock(
-                    span, samp_rate, [False, self.appendRule[-1]]
+                self.waveList + self.__class__._nullTicks(
+                    -ticks, samp_rate, [False, self.appendRule[-1]]
                     )
                 )
 
+    def _padded(self, ticks):
+        """
+        Backend method to pad 0s at the tail in a single step. Same as
+        appending a null block with the append rule [True, False], while the
+        synthesis is left to the first access of y.
+
+        Parameters
+        ----------
+        ticks : int
+            Number of ticks to be padded.
+
+        Returns
+        -------
+        Waveform
+            Padded result with a new reference.
+
+        """
+        padded = copy(self)
+        padded._waveList.append(NullWave(
+            sampling_rate=self.sampling_rate, appendRule=[True, False],
+            ticks=ticks
+            ))
+        padded._refresh()
+        return padded
+
     def fill_total_point(self, total_point=0):
         add_point = total_point - len(self)
         if add_point <= 0:
             return self
-        span = round((add_point + 1) * self.dx, self.__class__.EFF_TIME_DIGIT)
-        return self << span
+        return self._offsetTicks(-(add_point + 1))
 
     @classmethod
     def _nullBlock(cls,
@@ -767,17 +1149,51 @@ class Waveform(tpm.GenericWave):
             list for Waveform object generation.
 
         """
-        generator = setFunc(
-            'const', [0], span, sampling_rate, 'null', appendRule
-            )
-        return [Wave(generator)]
+        return [NullWave(span, sampling_rate, appendRule)]
+
+    @classmethod
+    def _nullTicks(cls,
+                   ticks=0,
+                   sampling_rate=1e9,
+                   appendRule=[False, False]):
+        """
+        Generate 0s to fill up empty space specified in integer ticks of the
+        sample clock.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class object.
+        ticks : int, optional
+            Time span in ticks. The default is 0.
+        sampling_rate : float, optional
+            Sampling rate for DAC. The default is 1e9 (Suggested).
+        appendRule : list, optional
+            List of append rules. The default is [False, False].
+
+        Returns
+        -------
+        list
+            list for Waveform object generation.
+
+        """
+        return [NullWave(sampling_rate=sampling_rate, appendRule=appendRule,
+                         ticks=ticks)]
 
     @classmethod
     def _synthesize(cls, waveList):
         """
-        Modded in V6
+        Modded in V7
         Backend function to compile the list of Wave objects into a complete
-        waveform (pulse train).
+        waveform (pulse train). The output length is resolved in a first pass
+        over the append rules, then every Wave object is written into a
+        single pre-allocated buffer by _stream(), so the cost is linear in
+        the total number of points.
+
+        Every junction shares one point between the adjacent waves:
+            T-T, F-T => the first point of the second wave is kept.
+            T-F      => the last point of the first wave is kept.
+            F-F      => the 2 points are averaged.
 
         Parameters
         ----------
@@ -785,63 +1201,290 @@ class Waveform(tpm.GenericWave):
             Waveform class object.
         waveList : list
             List of Wave objects to compiled into waveform.
-        appendOverlap : boolean, optional
-            Set overlapping mode. The default is False.
 
         Returns
         -------
         y : numpy.array
             y data.
-        x : numpy.array
-            x data.
+        t0 : float
+            Start time of the timeline.
+        sampling_rate : float
+            Common sampling rate of the Wave objects.
+
+        """
+        # 1st pass: output size
+        total, t0, sampling_rate = cls._timeline(waveList)
+        if not total:
+            return np.array([]), t0, sampling_rate
+        # 2nd pass: write each wave into place, as a single chunk
+        y, = cls._stream(waveList, total)
+        return y, t0, sampling_rate
+
+    @classmethod
+    def _timeline(cls, waveList):
+        """
+        Backend method to resolve the timeline of a synthesized wave list
+        from the lengths of the waves only.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class object.
+        waveList : list
+            List of Wave objects.
+
+        Returns
+        -------
+        n : int
+            Number of points.
+        t0 : float
+            Start time of the timeline.
+        sampling_rate : float
+            Sampling rate of the first Wave object.
+
+        Raises
+        ------
+        ValueError
+            The waves have different sampling rates.
+
+        """
+        waveList = [waveObj for waveObj in waveList if len(waveObj)]
+        if not waveList:
+            return 0, 0., 1e9
+        if len({waveObj.sampling_rate for waveObj in waveList}) > 1:
+            raise ValueError('Waves with different sampling rates')
+        n = len(waveList[0]) + sum(len(waveObj) - 1
+                                   for waveObj in waveList[1:])
+        return n, waveList[0].t0, waveList[0].sampling_rate
+
+    @classmethod
+    def _stream(cls, waveList, chunkSize=65536):
+        """
+        Backend generator of _synthesize(), yielding the synthesized y data
+        in consecutive chunks of chunkSize points (the last one may be
+        shorter). Only the current chunk is held in memory; it is yielded
+        once the next point has to be written, since a junction may still
+        modify its last point.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class object.
+        waveList : list
+            List of Wave objects to compiled into waveform.
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Yields
+        ------
+        numpy.array
+            Chunk of y data with a new reference.
 
         """
-        y = np.array([])
-        x = np.array([])
-        offset = 0
-        delEnd = 0
+        waveList = [waveObj for waveObj in waveList if len(waveObj)]
+        if not waveList:
+            return
+        if len({waveObj.sampling_rate for waveObj in waveList}) > 1:
+            raise ValueError('Waves with different sampling rates')
+        dtype = np.result_type(*[
+            waveObj.y.dtype for waveObj in waveList
+            if not isinstance(waveObj, NullWave)
+            ] or [float])
+        buffer = np.empty(chunkSize, dtype=dtype)
+        pos = 0
+        leftRule = None
         for waveObj in waveList:
-            if waveObj.x.size == 0:  # skip null waves
-                continue
-            if x.size == 0:  # initial null filling
-                y = waveObj.y
-                x = waveObj.x
-                offset = x[-1]
-                previous = waveObj
-                continue
-            # concatenate according to appendrules
-            leftRule = previous.appendRule[1]
-            rightRule = waveObj.appendRule[0]
-            if leftRule and rightRule:
-                delEnd = 1
-            if leftRule ^ rightRule:
-                if leftRule:
-                    # print('T-F')
-                    y = np.hstack([y[:len(y)-delEnd], waveObj.y[1:]])
-                else:
-                    # print('F-T')
-                    y = np.hstack([y[:-1-delEnd], waveObj.y])
-                x = np.hstack([x[:len(x)-delEnd], waveObj.x[1:] + offset])
+            isNull = isinstance(waveObj, NullWave)
+            y = None if isNull else waveObj.y
+            if leftRule is None:
+                # head wave is written as a whole
+                src = 0
             else:
-                if leftRule:
-                    # print('T-T')
-                    y = np.hstack([y[:len(y)-delEnd], waveObj.y])
-                    x = np.hstack(
-                        [x[:len(x)-delEnd], waveObj.x + offset]
-                        )
-                else:
+                first = 0 if isNull else y[0]
+                # concatenate according to appendrules
+                rightRule = waveObj.appendRule[0]
+                if rightRule:
+                    # print('T-T' / 'F-T')
+                    buffer[pos-1] = first
+                elif not leftRule:
+                    # print('F-F')
+                    buffer[pos-1] = (buffer[pos-1] + first) / 2
+                # print('T-F') keeps the last point of the previous wave
+                src = 1
+            while src < len(waveObj):
+                if pos == chunkSize:
+                    yield buffer
+                    buffer = np.empty(chunkSize, dtype=dtype)
+                    pos = 0
+                num = min(len(waveObj) - src, chunkSize - pos)
+                buffer[pos:pos+num] = 0 if isNull else y[src:src+num]
+                pos += num
+                src += num
+            leftRule = waveObj.appendRule[1]
+        yield buffer[:pos]
+
+    @classmethod
+    def _leading(cls, waveList, left=None, leftRule=None):
+        """
+        Backend method to find the first point of a synthesized wave list
+        when it is appended after a point with the given append rule, which
+        is the only point that depends on the preceding waves.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class object.
+        waveList : list
+            List of Wave objects.
+        left : float, optional
+            Last point of the preceding waves. The default is None.
+        leftRule : bool, optional
+            Append rule at the tail of the preceding waves, None if there is
+            no preceding wave. The default is None.
+
+        Returns
+        -------
+        value : float
+            First point.
+        leftRule : bool
+            Append rule at the tail of waveList.
+
+        """
+        value = left
+        settled = False
+        for waveObj in waveList:
+            if not len(waveObj):
+                continue
+            if not settled:
+                first = 0 if isinstance(waveObj, NullWave) else waveObj.y[0]
+                rightRule = waveObj.appendRule[0]
+                if leftRule is None or rightRule:
+                    # print('T-T' / 'F-T')
+                    value = first
+                elif not leftRule:
                     # print('F-F')
-                    y = np.hstack([y[:-1-delEnd],
-                                   np.array([(y[-1-delEnd] + waveObj.y[0])/2]),
-                                   waveObj.y[1:]])
-                    x = np.hstack([x[:len(x)-delEnd], waveObj.x[1:] + offset])
-            offset = x[-1]
-            previous = waveObj
-            delEnd = 0
-        return y[:len(y)-delEnd], np.round(
-            x[:len(x)-delEnd], cls.EFF_TIME_DIGIT
+                    value = (value + first) / 2
+                # print('T-F') keeps the last point of the previous wave
+                # the first point is settled once a wave covers 2 points
+                settled = len(waveObj) > 1
+            leftRule = waveObj.appendRule[1]
+        return value, leftRule
+
+    def quantize(self, bits=16, fullScale=1., markers=[], markerLevel=.5,
+                 chunkSize=65536):
+        """
+        Convert the waveform into signed integer DAC codes. The samples are
+        synthesized chunk by chunk straight into the integer output, so no
+        full-length float array is created. See _quantize() for the format.
+
+        Parameters
+        ----------
+        bits : int, optional
+            DAC resolution, up to 16. The default is 16.
+        fullScale : float, optional
+            Amplitude mapped to the largest code. The default is 1.
+        markers : list, optional
+            Waveforms of the same length packed as marker bits, the first one
+            into the lowest bit. The default is [].
+        markerLevel : float, optional
+            Marker bits are set where the marker waveform exceeds this level.
+            The default is .5.
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Raises
+        ------
+        ValueError
+            A marker waveform has a different number of points, or the
+            markers do not fit in the free bits.
+
+        Returns
+        -------
+        codes : numpy.array
+            int16 array of DAC codes.
+        clipped : int
+            Number of samples beyond the full scale, which are saturated.
+
+        """
+        return self.__class__._quantize(
+            self._waveList, [waveform._waveList for waveform in markers],
+            bits, fullScale, markerLevel, chunkSize
             )
 
+    @classmethod
+    def _quantize(cls, waveList, markerLists=[], bits=16, fullScale=1.,
+                  markerLevel=.5, chunkSize=65536):
+        """
+        Backend method to quantize a list of Wave objects into int16 DAC
+        codes. The codes are left aligned in the 16-bit word: for bits < 16
+        the 16 - bits low-order bits are free for markers.
+
+        Parameters
+        ----------
+        cls : Waveform class
+            Waveform class object.
+        waveList : list
+            List of Wave objects to be synthesized and quantized.
+        markerLists : list, optional
+            Lists of Wave objects for the marker bits. The default is [].
+        bits : int, optional
+            DAC resolution, up to 16. The default is 16.
+        fullScale : float, optional
+            Amplitude mapped to the largest code. The default is 1.
+        markerLevel : float, optional
+            Threshold of the marker bits. The default is .5.
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Returns
+        -------
+        codes : numpy.array
+            int16 array of DAC codes.
+        clipped : int
+            Number of saturated samples.
+
+        """
+        shift = 16 - bits
+        if not 0 <= shift < 16:
+            raise ValueError('DAC resolution must be within 1 to 16 bits')
+        if len(markerLists) > shift:
+            raise ValueError(
+                f'{len(markerLists)} markers do not fit in {shift} free bits'
+                )
+        waveList = [waveObj for waveObj in waveList if len(waveObj)]
+        total = sum(len(waveObj) - 1 for waveObj in waveList) + bool(waveList)
+        for bit, markerList in enumerate(markerLists):
+            points = cls._timeline(markerList)[0]
+            if points != total:
+                raise ValueError(
+                    f'Marker {bit} has {points} points, while the waveform '
+                    f'has {total}'
+                    )
+        codes = np.empty(total, dtype=np.int16)
+        top = 2**(bits - 1) - 1
+        scale = top / fullScale
+        pos = clipped = 0
+        streams = [cls._stream(waveList, chunkSize)] + [
+            cls._stream(markerList, chunkSize) for markerList in markerLists
+            ]
+        for y, *marks in zip(*streams):
+            if np.iscomplexobj(y):
+                raise TypeError('Complex samples cannot be quantized')
+            # the chunk is a fresh buffer, so it is scaled in place
+            np.multiply(y, scale, out=y)
+            np.rint(y, out=y)
+            clipped += int(np.count_nonzero(y > top))
+            clipped += int(np.count_nonzero(y < -top - 1))
+            np.clip(y, -top - 1, top, out=y)
+            chunk = codes[pos:pos + len(y)]
+            chunk[:] = y
+            if shift:
+                np.left_shift(chunk, shift, out=chunk)
+            for bit, mark in enumerate(marks):
+                chunk |= (mark > markerLevel).astype(np.int16) << bit
+            pos += len(y)
+        return codes, clipped
+
     @classmethod
     def _toWaveObjList(cls, waveform):
         """
@@ -893,10 +1536,57 @@ class QubitChannel(tpm.GenericWave):
         self.__class__.align(self)
         self._name = ''
 
+    def __copy__(self):
+        """
+        Shallow duplication. The copy has its own Waveform objects on the
+        wires, which share the waves and the read-only sample data with the
+        original ones.
+
+        Returns
+        -------
+        QubitChannel
+            Object with a new reference.
+
+        """
+        copied = self.__class__.__new__(self.__class__)
+        copied._wires = np.array([copy(waveform) for waveform in self._wires])
+        copied._wire_names = list(self._wire_names)
+        copied._name = self._name
+        return copied
+
+    def __deepcopy__(self, memo):
+        copied = copy(self)
+        memo[id(self)] = copied
+        copied._wires = np.array([
+            deepcopy(waveform, memo) for waveform in self._wires
+            ])
+        return copied
+
+    def _dump(self, writer):
+        return {
+            'wires': [writer.ref(waveform) for waveform in self._wires],
+            'wire_names': list(self._wire_names),
+            'name': self._name
+            }
+
+    @classmethod
+    def _restore(cls, state, reader):
+        obj = cls.__new__(cls)
+        obj._wires = np.array([reader.obj(ref) for ref in state['wires']])
+        obj._wire_names = state['wire_names']
+        obj._name = state['name']
+        return obj
+
+    @property
+    def t0(self):
+        return self._wires[0].t0
+
     @property
-    def x(self):
-        self._x = self._wires[0].x
-        return self._x
+    def sampling_rate(self):
+        return self._wires[0].sampling_rate
+
+    def __len__(self):
+        return len(self._wires[0])
 
     @property
     def y(self):
@@ -935,6 +1625,84 @@ class QubitChannel(tpm.GenericWave):
                 '' for i in range(len(self._wire_names) - len(nameList))
                 ]
 
+    def quantize(self, bits=16, fullScale=1., markers={}, markerLevel=.5,
+                 chunkSize=65536):
+        """
+        Convert the wires into signed integer DAC codes, see
+        Waveform.quantize().
+
+        Parameters
+        ----------
+        bits : int, optional
+            DAC resolution, up to 16. The default is 16.
+        fullScale : float, optional
+            Amplitude mapped to the largest code. The default is 1.
+        markers : dict, optional
+            {wire: [marker wire, ...]} with wires given by name or index. The
+            marker wires are packed into the low-order bits of the wire and
+            not output on their own. The default is {}.
+        markerLevel : float, optional
+            Threshold of the marker bits. The default is .5.
+        chunkSize : int, optional
+            Number of points per chunk. The default is 65536.
+
+        Returns
+        -------
+        codes : dict
+            {wire index: int16 array of DAC codes}.
+        clipped : dict
+            {wire index: number of saturated samples}.
+
+        Raises
+        ------
+        ValueError
+            Unknown wire, a wire used both as a marker and as an output, or
+            markers not matching their wire, see Waveform.quantize().
+
+        """
+        return self.__class__._quantizeWires(
+            [waveform._waveList for waveform in self._wires],
+            self._wire_names, bits, fullScale, markers, markerLevel, chunkSize
+            )
+
+    @classmethod
+    def _quantizeWires(cls, waveLists, wire_names, bits=16, fullScale=1.,
+                       markers={}, markerLevel=.5, chunkSize=65536):
+        """
+        Backend method of quantize() working on the wave lists of the wires.
+
+        """
+        def index(wire):
+            if isinstance(wire, (int, np.integer)):
+                if not 0 <= wire < len(waveLists):
+                    raise ValueError(
+                        f'Wire index {wire} out of {len(waveLists)} wires'
+                        )
+                return int(wire)
+            if wire not in wire_names:
+                raise ValueError(f'Unknown wire {wire!r}')
+            return wire_names.index(wire)
+        markers = {
+            index(wire): [index(mark) for mark in marks]
+            for wire, marks in markers.items()
+            }
+        used = {mark for marks in markers.values() for mark in marks}
+        if used & set(markers):
+            raise ValueError(
+                f'Wires {sorted(used & set(markers))} are used both as '
+                'markers and as outputs'
+                )
+        codes, clipped = {}, {}
+        for wire_idx, waveList in enumerate(waveLists):
+            if wire_idx in used:
+                continue
+            codes[wire_idx], clipped[wire_idx] = Waveform._quantize(
+                waveList,
+                [waveLists[mark] for mark in markers.get(wire_idx, [])],
+                bits, fullScale, markerLevel, chunkSize
+                )
+        return codes, clipped
+
     def get_wire(self, wire_name=''):
         """
         Get Waveform object from specified wirename.
@@ -1082,7 +1850,7 @@ class QubitChannel(tpm.GenericWave):
             Appended QubitChannel object with a new reference.
 
         """
-        nullblock = Waveform._nullBlock(self.span, self.df)
+        nullblock = Waveform._nullTicks(self.ticks, self.sampling_rate)
         wires = np.insert(self._wires, wireIndex, nullblock)
         return QubitChannel(*wires)
 
@@ -1160,16 +1928,60 @@ class QubitChannel(tpm.GenericWave):
 
         """
         if ref:
+            # align with a virtual null block, only the padding is generated
+            samp_rate = qcObj.sampling_rate
             if isinstance(ref, float):
-                longest = Waveform(Waveform._nullBlock(ref, qcObj.df))
+                refLen = get_points(ref, samp_rate)
             else:
-                longest = Waveform(Waveform._nullBlock(ref.span, qcObj.df))
-        else:
-            longest = max(qcObj._wires, key=len)
+                refLen = len(ref)
+            tailRule = False
+            for waveform in qcObj._wires:
+                if len(waveform) < refLen:
+                    waveform.waveList = waveform.waveList + Waveform._nullTicks(
+                        refLen - len(waveform), samp_rate, [True, tailRule]
+                        )
+                elif len(waveform) > refLen:
+                    refLen, tailRule = len(waveform), waveform.appendRule[-1]
+            return
+        longest = max(qcObj._wires, key=len)
         for waveform in qcObj._wires:
-            if waveform is not longest:
+            if not waveform.sameTimeline(longest):
                 longest <<= waveform
 
+    @classmethod
+    def _padded(cls, qcObj, points):
+        """
+        Backend method to pad every wire with 0s at the tail up to the given
+        number of points in a single step.
+
+        Parameters
+        ----------
+        cls : QubitChannel class
+            QubitChannel class.
+        qcObj : QubitChannel
+            QubitChannel object to be padded.
+        points : int
+            Number of points after padding.
+
+        Returns
+        -------
+        QubitChannel
+            Padded QubitChannel object with a new reference, or qcObj itself
+            if no wire is shorter.
+
+        """
+        if all(len(waveform) >= points for waveform in qcObj._wires):
+            return qcObj
+        padded = cls.__new__(cls)
+        padded._wires = np.array([
+            waveform._padded(points - len(waveform))
+            if len(waveform) < points else waveform
+            for waveform in qcObj._wires
+            ])
+        padded._wire_names = list(qcObj._wire_names)
+        padded._name = qcObj._name
+        return padded
+
     @classmethod
     def alignQubitChannels(cls, *qcObjList):
         """
@@ -1192,9 +2004,42 @@ class QubitChannel(tpm.GenericWave):
             return *qcObjList,
         longest = max(qcObjList, key=len)
         for qcObj in qcObjList:
-            cls.align(qcObj, longest)
+            if not qcObj.sameTimeline(longest):
+                cls.align(qcObj, longest)
         return *qcObjList,
 
+    @classmethod
+    def concatQubitChannels(cls, *qcObjList):
+        """
+        Concatenate QubitChannel objects in a single pass. Equivalent to
+        summing them up one by one, but each wire is synthesized only once.
+
+        Parameters
+        ----------
+        cls : QubitChannel
+            QubitChannel class.
+        *qcObjList : QubitChannel
+            QubitChannel objects to be concatenated in order.
+
+        Returns
+        -------
+        QubitChannel
+            Concatenated QubitChannel object with a new reference.
+
+        """
+        wirenum = len(qcObjList[0]._wires)
+        if any(len(qcObj._wires) != wirenum for qcObj in qcObjList):
+            raise ValueError('Wire concatenation with unequal size arrays')
+        wires = [
+            Waveform._fromWaveList([
+                wave for qcObj in qcObjList
+                for wave in qcObj._wires[idx]._waveList
+                ]) for idx in range(wirenum)
+            ]
+        temp = QubitChannel(*wires)
+        temp.wire_names = qcObjList[0].wire_names
+        return temp
+
     @classmethod
     def null(cls, spanRef, wireRef, default_sampling_rate=1e9):
         """
@@ -1220,12 +2065,12 @@ class QubitChannel(tpm.GenericWave):
 
         """
         if isinstance(spanRef, float):
-            nullblock = Waveform(Waveform._nullBlock(
+            nullblock = Waveform._fromWaveList(Waveform._nullBlock(
                 spanRef, default_sampling_rate
                 ))
         else:
-            nullblock = Waveform(Waveform._nullBlock(
-                spanRef.span, spanRef.df
+            nullblock = Waveform._fromWaveList(Waveform._nullTicks(
+                spanRef.ticks, spanRef.sampling_rate
                 ))
         if isinstance(wireRef, int):
             wirenum = wireRef
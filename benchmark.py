@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 10:12:05 2026
+
+Timing benchmarks for the compiler backend. Run as a script:
+    python benchmark.py
+
+@author: user
+"""
+from timeit import default_timer as timer
+import numpy as np
+from QuantumCompiler.ShapeModule import setFunc
+from QuantumCompiler.WaveModule import Wave, Waveform
+from QuantumCompiler.QuantumCircuit import QuantumCircuit
+from QuantumCompiler.TemplateModule import GenericGate
+
+
+def bench_synthesize(segmentNums=(100, 1000, 10000, 100000)):
+    """
+    Time Waveform._synthesize over sequences of alternating pulse and idle
+    segments. A linear engine keeps the time per segment flat.
+
+    Parameters
+    ----------
+    segmentNums : tuple, optional
+        Numbers of segments to be synthesized. The default is
+        (100, 1000, 10000, 100000).
+
+    """
+    pulse = Wave(setFunc('gaussian', [10e-9, 2.5e-9], 20e-9))
+    idle = Wave(setFunc('const', [0], 10e-9, appendRule=[False, False]))
+    print('segments    total (s)    per segment (us)')
+    for num in segmentNums:
+        waveList = [pulse, idle] * (num // 2)
+        start = timer()
+        Waveform._synthesize(waveList)
+        elapsed = timer() - start
+        print(f'{num:>8d}    {elapsed:>9.4f}    {elapsed / num * 1e6:>16.3f}')
+
+
+def bench_sweep(sweepNums=(10, 100, 1000)):
+    """
+    Compare a Gaussian sigma sweep built with Wave.sweep against one Wave
+    per value.
+
+    Parameters
+    ----------
+    sweepNums : tuple, optional
+        Numbers of sweep values. The default is (10, 100, 1000).
+
+    """
+    generator = setFunc('gaussian', [50e-9, 10e-9], 100e-9)
+    print('values    sweep (s)    one by one (s)')
+    for num in sweepNums:
+        sigmas = np.linspace(1e-9, 20e-9, num)
+        start = timer()
+        Wave.sweep(generator, sigma=sigmas)
+        swept = timer() - start
+        start = timer()
+        for sigma in sigmas:
+            Wave(setFunc('gaussian', [50e-9, sigma], 100e-9))
+        elapsed = timer() - start
+        print(f'{num:>6d}    {swept:>9.5f}    {elapsed:>14.5f}')
+
+
+def bench_assign(depths=(1000, 10000, 100000), qubitNum=4):
+    """
+    Time QuantumCircuit.assign while filling circuits of increasing depth
+    moment by moment. Sparse storage keeps the time per placement flat.
+
+    Parameters
+    ----------
+    depths : tuple, optional
+        Numbers of moments of the circuits. The default is
+        (1000, 10000, 100000).
+    qubitNum : int, optional
+        Number of qubits. The default is 4.
+
+    """
+    pulse = ~Wave(setFunc('gaussian', [10e-9, 2.5e-9], 20e-9))
+    pulse.name = 'q'
+    print('moments    total (s)    per placement (us)')
+    for depth in depths:
+        qc = QuantumCircuit([f'q{i}' for i in range(qubitNum)])
+        start = timer()
+        for time_idx in range(depth):
+            for qubit_idx in range(qubitNum):
+                qc.assign(pulse, (qubit_idx, time_idx))
+        elapsed = timer() - start
+        print(f'{depth:>7d}    {elapsed:>9.4f}    '
+              f'{elapsed / depth / qubitNum * 1e6:>18.3f}')
+
+
+def bench_compile(sizes=((10, 200), (20, 1000), (50, 5000)), fill=.7):
+    """
+    Time QuantumCircuit.compileCkt over randomly filled circuit diagrams.
+
+    Parameters
+    ----------
+    sizes : tuple, optional
+        (qubit number, moment number) pairs of the circuits. The default is
+        ((10, 200), (20, 1000), (50, 5000)).
+    fill : float, optional
+        Probability of a cell being assigned. The default is .7.
+
+    """
+    pulse = ~Wave(setFunc('gaussian', [10e-9, 2.5e-9], 20e-9))
+    null = Waveform(Waveform._nullBlock(pulse.span))
+    channel = ~pulse / ~null
+    channel.name = 'q'
+    gate = GenericGate(channel)
+    rng = np.random.default_rng(0)
+    print('qubits    moments    assign (s)    compile (s)')
+    for qubitNum, momentNum in sizes:
+        qc = QuantumCircuit([f'q{i}' for i in range(qubitNum)])
+        occupied = rng.random((qubitNum, momentNum)) < fill
+        occupied[:, 0] = True
+        start = timer()
+        for qubit_idx, time_idx in zip(*np.nonzero(occupied)):
+            qc.assign(gate, {'q': (f'q{qubit_idx}', time_idx)})
+        assigned = timer()
+        qc.compileCkt()
+        elapsed = timer() - assigned
+        print(f'{qubitNum:>6d}    {momentNum:>7d}    '
+              f'{assigned - start:>10.4f}    {elapsed:>11.4f}')
+
+
+if __name__ == '__main__':
+    bench_synthesize()
+    bench_sweep()
+    bench_assign()
+    bench_compile()